@@ -1,46 +1,84 @@
+import asyncio
+import logging
+import logging.handlers
+import sys
 import time
 import os
 from typing import List
 from scraper.collector import StateElectionScraper
-from models.data_models import Party, ElectionResult, StateData, YearData
-from utils.file_handler import save_to_csv, save_to_json 
+from models.data_models import Party, ElectionResult, StateData, YearData, PARTY_VALUES
+from utils.file_handler import ResultFileWriter
 
 TARGET_YEARS = [2020, 2016, 2012, 2008, 2004, 2000]
 SCRAPER_DELAY_SECONDS = 0.7 
 OUTPUT_DIR = "output" 
 CSV_FILENAME = "election_results_combined.csv" 
 JSON_FILENAME = "election_results_combined.json"
+RESULTS_TO_SHOW = 5
+
+# Run summary goes through a buffered handler: records are held in memory and written to stdout
+# in batches instead of a flush per line; run_test_scrape flushes after the banner and on the way out
+logger = logging.getLogger('scrape')
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter('%(message)s'))
+_memory_handler = logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=_stdout_handler)
+logger.addHandler(_memory_handler)
+
+def print_sample_results(results: List[ElectionResult], results_to_show: int = RESULTS_TO_SHOW):
+    """Logs the first few results as a single record."""
+    lines: List[str] = ["\n" + "-" * 30, f"Sample Results (first {min(results_to_show, len(results))}):", "-" * 30]
+    for count, result in enumerate(results[:results_to_show]):
+        si = result.state_info
+        yi = result.year_info
+        lines.append(f"Result #{count + 1}:")
+        lines.append(f"  State: {si.state_name} (EV: {si.electoral_votes})")
+        lines.append(f"  Year: {yi.year}")
+        lines.append(f"  DEM: {yi.dem_leader} - National Votes: {yi.dem_votes}")
+        lines.append(f"  REP: {yi.rep_leader} - National Votes: {yi.rep_votes}")
+        lines.append(f"  State %: DEM {result.dem_percentage} / REP {result.rep_percentage}")
+        lines.append(f"  State Winner: {PARTY_VALUES[result.winner] if result.winner else 'N/A'}")
+    logger.info("\n".join(lines))
+
+async def scrape_and_save(scraper: StateElectionScraper) -> List[ElectionResult]:
+    """Writes each state's results to disk as soon as it is scraped; returns a small sample for printing."""
+    sample: List[ElectionResult] = []
+    with ResultFileWriter(CSV_FILENAME, JSON_FILENAME, OUTPUT_DIR) as writer:
+        async for state_results in scraper.iter_states_async():
+            writer.write(state_results)
+            if len(sample) < RESULTS_TO_SHOW:
+                sample.extend(state_results[:RESULTS_TO_SHOW - len(sample)])
+        logger.info(f"\nScraping finished. Collected {writer.count} total election results.")
+    return sample
 
 def run_test_scrape():
-    """Runs the scraper, prints test output, and saves results to files."""
-    print("-" * 30)
-    print("Starting Combined Scraper Run...")
-    print("-" * 30)
-
-    scraper = StateElectionScraper(
-        target_years=TARGET_YEARS,
-        delay_seconds=SCRAPER_DELAY_SECONDS
-    )
-
-    all_results: List[ElectionResult] = scraper.scrape_all_states()
-
-    if not all_results:
-        print("No results were collected.")
-        return
-
-    print("\n" + "-" * 30)
-    print("Saving Results...")
-    print("-" * 30)
-    if all_results:
-        save_to_csv(all_results, CSV_FILENAME, OUTPUT_DIR)
-        save_to_json(all_results, JSON_FILENAME, OUTPUT_DIR)
-    else:
-        print("Skipping file saving as no results were collected.")
+    """Runs the scraper, streams results to files, and logs test output."""
+    logger.info("-" * 30)
+    logger.info("Starting Combined Scraper Run...")
+    logger.info("-" * 30)
+    _memory_handler.flush() # banner goes out before the scraper's own progress logging
+
+    try:
+        with StateElectionScraper(
+            target_years=TARGET_YEARS,
+            delay_seconds=SCRAPER_DELAY_SECONDS
+        ) as scraper:
+            sample_results = asyncio.run(scrape_and_save(scraper))
+
+        if not sample_results:
+            logger.info("No results were collected.")
+            return
+
+        print_sample_results(sample_results)
+    finally:
+        _memory_handler.flush() # summary is written even if the run fails, ahead of any traceback
 
 if __name__ == "__main__":
     start_time = time.time()
     run_test_scrape()
     end_time = time.time()
-    print(f"\nTotal execution time: {end_time - start_time:.2f} seconds.")
-    print("\nNote:")
-    print(f"- Check the '{OUTPUT_DIR}' directory for '{CSV_FILENAME}' and '{JSON_FILENAME}' output files.")
\ No newline at end of file
+    logger.info(f"\nTotal execution time: {end_time - start_time:.2f} seconds.")
+    logger.info("\nNote:")
+    logger.info(f"- Check the '{OUTPUT_DIR}' directory for '{CSV_FILENAME}' and '{JSON_FILENAME}' output files.")
+    _memory_handler.flush()
\ No newline at end of file
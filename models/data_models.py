@@ -1,106 +1,109 @@
 # models/data_models.py
-from typing import Optional, Dict, Union
+from typing import Optional, Dict, Union, final
+from dataclasses import dataclass
 from enum import Enum
-import re # Import re for cleaning vote strings
+import logging
+import operator
+
+logger = logging.getLogger(__name__)
 
 class Party(Enum):
     DEMOCRATIC = "Democratic"
     REPUBLICAN = "Republican"
     OTHER = "Other"
 
+# Plain dict probe for serialization loops instead of the Enum .value descriptor
+PARTY_VALUES: Dict[Party, str] = {party: party.value for party in Party}
+
+# Characters stripped from vote strings like "81,268,924"; str.translate avoids a regex pass per field
+_VOTE_DELETE = str.maketrans('', '', ', \t\n\r\f\v\xa0')
+
+def _check_votes(votes: Optional[Union[int, str]], year: int, vote_type: str) -> Optional[int]:
+    """ Check: votes should be an integer >= 0 (or None), handles comma strings."""
+    if votes is None:
+        return None
+
+    try:
+        if isinstance(votes, str): # Common case: scraped text like "81,268,924"
+            value = int(votes.translate(_VOTE_DELETE))
+        elif isinstance(votes, float) and votes.is_integer():
+            value = int(votes)
+        else:
+            value = operator.index(votes) # Rejects non-integral types without a type ladder
+    except (ValueError, TypeError):
+        value = None
+
+    if value is None or value < 0:
+        if __debug__ and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"({year}): Invalid value {votes!r} for {vote_type} votes. Storing 'None'.")
+        return None
+
+    return value
+
+def _check_percentage(percent: Optional[float], party_name: str) -> Optional[float]:
+    """ Helper check: percentages should be numbers between 0 and 100. """
+    if percent is not None:
+        if not isinstance(percent, (int, float)):
+            raise TypeError(f"{party_name} percentage must be a number, got {type(percent)}.")
+        if not (0 <= percent <= 100):
+            raise ValueError(f"{party_name} percentage must be between 0 and 100, got {percent}.")
+    return percent
+
+@final
+@dataclass(slots=True, frozen=True)
 class StateData:
     """
     Holds information specific to a US State: name, electoral votes, population.
     """
-    def __init__(self,
-                 state_name: str,
-                 electoral_votes: Optional[int] = None,
-                 total_population: Optional[int] = None):
-        """ Initializes state-level data. """
-        if not state_name or not isinstance(state_name, str):
+    state_name: str
+    electoral_votes: Optional[int] = None
+    total_population: Optional[int] = None
+
+    def __post_init__(self):
+        """ Validates state-level data. """
+        if not self.state_name or not isinstance(self.state_name, str):
             raise ValueError("State name must be a non-empty string.")
-        self.state_name: str = state_name
 
-        if electoral_votes is not None and not isinstance(electoral_votes, int):
-            raise TypeError(f"Electoral votes must be an integer, got {type(electoral_votes)}.")
-        self.electoral_votes: Optional[int] = electoral_votes
+        if self.electoral_votes is not None and not isinstance(self.electoral_votes, int):
+            raise TypeError(f"Electoral votes must be an integer, got {type(self.electoral_votes)}.")
 
-        if total_population is not None and not isinstance(total_population, int):
-            raise TypeError(f"Total population must be an integer, got {type(total_population)}.")
-        self.total_population: Optional[int] = total_population
+        if self.total_population is not None and not isinstance(self.total_population, int):
+            raise TypeError(f"Total population must be an integer, got {type(self.total_population)}.")
 
     def __repr__(self) -> str:
         """ Developer-friendly representation. """
         return (f"StateData(name='{self.state_name}', "
                 f"EV={self.electoral_votes}, Pop={self.total_population})")
 
+@final
+@dataclass(slots=True, frozen=True)
 class YearData:
     """
     Holds information specific to a single election year: year, candidates, national votes.
     Note: dem_votes, rep_votes, total_votes here refer to NATIONAL totals.
     """
-    def __init__(self,
-                 year: int,
-                 dem_leader: Optional[str] = None,
-                 rep_leader: Optional[str] = None,
-                 dem_votes: Optional[int] = None, # National Popular Votes
-                 rep_votes: Optional[int] = None, # National Popular Votes
-                 total_votes: Optional[int] = None): # Potentially national total, often None
-        """ Initializes year-specific data. """
-        if not isinstance(year, int):
-             raise TypeError(f"Election year must be an integer, got {type(year)}.")
-        self.year: int = year
-
-        if dem_leader is not None and not isinstance(dem_leader, str):
-            raise TypeError(f"Democratic leader must be a string, got {type(dem_leader)}.")
-        self.dem_leader: Optional[str] = dem_leader
-
-        if rep_leader is not None and not isinstance(rep_leader, str):
-            raise TypeError(f"Republican leader must be a string, got {type(rep_leader)}.")
-        self.rep_leader: Optional[str] = rep_leader
-
-        # Check and store votes (now handles strings with commas)
-        self.dem_votes: Optional[int] = self._check_votes(dem_votes, "Democratic National")
-        self.rep_votes: Optional[int] = self._check_votes(rep_votes, "Republican National")
-        self.total_votes: Optional[int] = self._check_votes(total_votes, "Total National") # Usually derived or None
-
-    def _check_votes(self, votes: Optional[Union[int, str]], vote_type: str) -> Optional[int]:
-        """ Check: votes should be an integer >= 0 (or None), handles comma strings."""
-        if votes is None:
-            return None
-
-        original_votes = votes # Keep for logging
-
-        if isinstance(votes, str):
-            # Clean the string: remove commas, whitespace
-            cleaned_votes = re.sub(r'[,\s]', '', votes)
-            if cleaned_votes.isdigit():
-                try:
-                    votes = int(cleaned_votes)
-                except ValueError:
-                     print(f"Warning ({self.year}): Could not convert cleaned string '{cleaned_votes}' to integer for {vote_type} votes. Original: '{original_votes}'. Storing 'None'.")
-                     return None
-            else:
-                 # Handle cases like 'N/A' or other non-numeric strings if necessary
-                 print(f"Warning ({self.year}): Non-numeric string value '{original_votes}' for {vote_type} votes. Storing 'None'.")
-                 return None
-        elif isinstance(votes, float):
-             if votes.is_integer() and votes >= 0:
-                 votes = int(votes)
-             else:
-                 print(f"Warning ({self.year}): Non-integer float value '{original_votes}' for {vote_type} votes. Storing 'None'.")
-                 return None
-        elif not isinstance(votes, int):
-             print(f"Warning ({self.year}): Expected integer or parseable string for {vote_type} votes, got {type(original_votes)} '{original_votes}'. Storing 'None'.")
-             return None
-
-        # Final check after potential conversion
-        if votes < 0:
-            print(f"Warning ({self.year}): {vote_type} votes '{votes}' is negative (Original: '{original_votes}'). Storing 'None'.")
-            return None
-
-        return votes
+    year: int
+    dem_leader: Optional[str] = None
+    rep_leader: Optional[str] = None
+    dem_votes: Optional[int] = None # National Popular Votes
+    rep_votes: Optional[int] = None # National Popular Votes
+    total_votes: Optional[int] = None # Potentially national total, often None
+
+    def __post_init__(self):
+        """ Validates year-specific data and normalizes vote counts. """
+        if not isinstance(self.year, int):
+             raise TypeError(f"Election year must be an integer, got {type(self.year)}.")
+
+        if self.dem_leader is not None and not isinstance(self.dem_leader, str):
+            raise TypeError(f"Democratic leader must be a string, got {type(self.dem_leader)}.")
 
+        if self.rep_leader is not None and not isinstance(self.rep_leader, str):
+            raise TypeError(f"Republican leader must be a string, got {type(self.rep_leader)}.")
+
+        # Check and store votes (handles strings with commas); frozen, so bypass __setattr__
+        object.__setattr__(self, 'dem_votes', _check_votes(self.dem_votes, self.year, "Democratic National"))
+        object.__setattr__(self, 'rep_votes', _check_votes(self.rep_votes, self.year, "Republican National"))
+        object.__setattr__(self, 'total_votes', _check_votes(self.total_votes, self.year, "Total National")) # Usually derived or None
 
     def __repr__(self) -> str:
         """ Developer-friendly representation. """
@@ -109,38 +112,30 @@ class YearData:
                 f"DEM_Nat_Votes={self.dem_votes}, REP_Nat_Votes={self.rep_votes}, "
                 f"TotalNatVotes={self.total_votes})")
 
+@final
+@dataclass(slots=True, frozen=True)
 class ElectionResult:
     """
     Connects state information, year information (incl. national leaders/votes),
     and the state-level percentage results for a specific election.
     """
-    def __init__(self,
-                 state_info: StateData,
-                 year_info: YearData,
-                 dem_percentage: Optional[float] = None, # State-level %
-                 rep_percentage: Optional[float] = None, # State-level %
-                 winner: Optional[Party] = None):       # State-level winner
-        """ Initializes the election result link. """
-        if not isinstance(state_info, StateData):
-            raise TypeError(f"state_info must be an instance of StateData, got {type(state_info)}.")
-        self.state_info: StateData = state_info
-
-        if not isinstance(year_info, YearData):
-            raise TypeError(f"year_info must be an instance of YearData, got {type(year_info)}.")
-        self.year_info: YearData = year_info
-
-        self.dem_percentage: Optional[float] = self._check_percentage(dem_percentage, "Democratic (State)")
-        self.rep_percentage: Optional[float] = self._check_percentage(rep_percentage, "Republican (State)")
-        self.winner: Optional[Party] = winner # Assumes winner is validated elsewhere if needed
-
-    def _check_percentage(self, percent: Optional[float], party_name: str) -> Optional[float]:
-        """ Helper check: percentages should be numbers between 0 and 100. """
-        if percent is not None:
-            if not isinstance(percent, (int, float)):
-                raise TypeError(f"{party_name} percentage must be a number, got {type(percent)}.")
-            if not (0 <= percent <= 100):
-                raise ValueError(f"{party_name} percentage must be between 0 and 100, got {percent}.")
-        return percent
+    state_info: StateData
+    year_info: YearData
+    dem_percentage: Optional[float] = None # State-level %
+    rep_percentage: Optional[float] = None # State-level %
+    winner: Optional[Party] = None         # State-level winner
+
+    def __post_init__(self):
+        """ Validates the election result link. """
+        if not isinstance(self.state_info, StateData):
+            raise TypeError(f"state_info must be an instance of StateData, got {type(self.state_info)}.")
+
+        if not isinstance(self.year_info, YearData):
+            raise TypeError(f"year_info must be an instance of YearData, got {type(self.year_info)}.")
+
+        _check_percentage(self.dem_percentage, "Democratic (State)")
+        _check_percentage(self.rep_percentage, "Republican (State)")
+        # Assumes winner is validated elsewhere if needed
 
     def __repr__(self) -> str:
         """ Developer-friendly representation showing the link. """
@@ -148,7 +143,7 @@ class ElectionResult:
         year = self.year_info.year if self.year_info else 'N/A'
         return (f"ElectionResult(State='{state_name}', Year={year}, "
                 f"DEM%={self.dem_percentage}, REP%={self.rep_percentage}, "
-                f"StateWinner={self.winner.value if self.winner else 'N/A'})")
+                f"StateWinner={PARTY_VALUES[self.winner] if self.winner else 'N/A'})")
 
     # Properties to access underlying data easily
     @property
@@ -157,4 +152,4 @@ class ElectionResult:
 
     @property
     def year(self) -> int:
-        return self.year_info.year
\ No newline at end of file
+        return self.year_info.year
@@ -1,10 +1,57 @@
+import asyncio
+import logging
+import shelve
+import sys
+import threading
+import aiohttp
 import requests
-from typing import List, Optional, Dict, Any
+from datetime import timedelta
+from urllib.parse import urljoin, urlsplit
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import List, Optional, Dict, Any, Iterator, AsyncIterator, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from .parser import (fetch_and_parse, parse_state_links,
-                    parse_state_details, parse_election_results_table)
+from .parser import (fetch_and_parse, fetch_and_parse_async, parse_state_links,
+                    parse_state_details, parse_election_results_table, ParsedYearRow)
 from models.data_models import StateData, YearData, ElectionResult, Party
-from scraper.years import scrape_election_year 
+from scraper.years import scrape_years, scrape_election_year_async
+from scraper.throttle import HostThrottle
+from scraper.http_session import HEADERS, configure_session
+
+logger = logging.getLogger(__name__)
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+try:
+    from aiohttp_client_cache import CachedSession as AsyncCachedSession, SQLiteBackend
+except ImportError:
+    AsyncCachedSession = None
+
+try:
+    import httpx
+    import h2  # noqa: F401  (required for http2=True)
+except ImportError:
+    httpx = None
+
+def _normalize_url(url: str) -> str:
+    """ Visited-set key for a page URL: no fragment, no trailing slash, lower-cased host. """
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}" + (f"?{parts.query}" if parts.query else "")
+
+def _dedupe_state_links(state_links: Dict[str, str]) -> Dict[str, str]:
+    """ Drops entries whose URL was already scheduled under another name, so each page is fetched once. """
+    visited = set()
+    unique_links = {}
+    for state_name, state_url_path in state_links.items():
+        key = _normalize_url(urljoin(StateElectionScraper.BASE_URL, state_url_path))
+        if key in visited:
+            logger.debug(f"Skipping duplicate link for {state_name}: {state_url_path}")
+            continue
+        visited.add(key)
+        unique_links[state_name] = state_url_path
+    return unique_links
 
 class StateElectionScraper:
     """
@@ -15,50 +62,138 @@ class StateElectionScraper:
     BASE_URL = "https://www.270towin.com"
     STATES_LIST_URL = f"{BASE_URL}/states/"
     DEFAULT_TARGET_YEARS = [2020, 2016, 2012, 2008, 2004, 2000, 1996, 1992]
-    MAX_WORKERS = 5  
+    MAX_WORKERS = 16
+    MAX_CONCURRENT_REQUESTS = 10
+    CONNECTOR_LIMIT = 20
+    CONNECTOR_LIMIT_PER_HOST = 4
+    POOL_CONNECTIONS = 16
+    POOL_MAXSIZE = 32
+    CACHE_NAME = '.scrape_cache'
+    ASYNC_CACHE_NAME = '.scrape_cache_async.sqlite'
+    CACHE_EXPIRE_AFTER = timedelta(days=30)
+    CHECKPOINT_NAME = '.scrape_progress'
+    # State pages are only read for the EV spans/headings and the results table; skip building the rest
+    _STATE_PAGE_STRAINER = SoupStrainer(['span', 'h2', 'h3', 'table'])
 
-    def __init__(self, target_years: Optional[List[int]] = None, delay_seconds: float = 0.5):
+    def __init__(self, target_years: Optional[List[int]] = None, delay_seconds: float = 0.5,
+                 use_cache: bool = True, resume: bool = True):
         self.target_years = sorted(list(set(target_years))) if target_years else self.DEFAULT_TARGET_YEARS
+        # Membership set for the per-row year filter in parse_election_results_table
+        self._target_years_set = frozenset(self.target_years)
         self.delay_seconds = delay_seconds
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive'
-        })
+        self.use_cache = use_cache
+        self.resume = resume
+        self.throttle = HostThrottle(delay_seconds)
+        self.headers = dict(HEADERS)
+        if use_cache and requests_cache is not None:
+            # Historical election pages don't change between runs, so re-runs are served from disk.
+            self.session = requests_cache.CachedSession(
+                self.CACHE_NAME, backend='sqlite',
+                expire_after=self.CACHE_EXPIRE_AFTER, allowable_codes=(200,),
+                stale_if_error=True # an expired page beats no page when the site is down
+            )
+        else:
+            self.session = requests.Session()
+        configure_session(self.session, self.POOL_CONNECTIONS, self.POOL_MAXSIZE)
         self.national_year_data: Dict[int, Dict[str, Any]] = {}
-        print(f"Initialized scraper for years: {self.target_years} with delay {self.delay_seconds}s.")
+        self._state_cache: Dict[str, StateData] = {}
+        # National YearData is identical for every state, so one frozen instance per year is shared
+        self._year_cache: Dict[int, YearData] = {}
+        # Same in-flight cap as the async path's semaphore; extra workers only overlap parsing
+        self._request_slots = threading.BoundedSemaphore(self.MAX_CONCURRENT_REQUESTS)
+        logger.info(f"Initialized scraper for years: {self.target_years} with delay {self.delay_seconds}s.")
+
+    def close(self):
+        """Releases the pooled keep-alive connections held by the session."""
+        self.session.close()
+
+    def __enter__(self) -> "StateElectionScraper":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open_async_session(self):
+        """
+        Creates the client for the async scrape. Preference order: the on-disk cached aiohttp session,
+        then an HTTP/2 httpx client (all requests multiplexed over one connection), then plain aiohttp.
+        """
+        if self.use_cache and AsyncCachedSession is not None:
+            connector = aiohttp.TCPConnector(limit=self.CONNECTOR_LIMIT, limit_per_host=self.CONNECTOR_LIMIT_PER_HOST)
+            cache = SQLiteBackend(self.ASYNC_CACHE_NAME, expire_after=self.CACHE_EXPIRE_AFTER, allowed_codes=(200,))
+            return AsyncCachedSession(cache=cache, connector=connector, headers=self.headers)
+        if httpx is not None:
+            limits = httpx.Limits(max_connections=self.CONNECTOR_LIMIT, max_keepalive_connections=self.CONNECTOR_LIMIT)
+            return httpx.AsyncClient(http2=True, headers=self.headers, limits=limits, timeout=30,
+                                     follow_redirects=True)
+        connector = aiohttp.TCPConnector(limit=self.CONNECTOR_LIMIT, limit_per_host=self.CONNECTOR_LIMIT_PER_HOST)
+        return aiohttp.ClientSession(connector=connector, headers=self.headers)
 
     def _fetch_national_year_data(self):
-        """Fetches national leader and vote data for each target year."""
-        print(f"\nFetching national data for years: {self.target_years}...")
-        for year in self.target_years:
-            print(f"  Fetching national data for {year}...")
-            year_results = scrape_election_year(year) 
-            if year_results:
-                year_entry = {'dem_leader': None, 'rep_leader': None, 'dem_votes': None, 'rep_votes': None}
-                for candidate_data in year_results:
-                    party = candidate_data.get("party")
-                    leader = candidate_data.get("leader")
-                    pop_votes = candidate_data.get("popular_votes")
-                    if party == "Democratic":
-                        year_entry['dem_leader'] = leader
-                        year_entry['dem_votes'] = pop_votes 
-                    elif party == "Republican":
-                        year_entry['rep_leader'] = leader
-                        year_entry['rep_votes'] = pop_votes 
-                self.national_year_data[year] = year_entry
-                print(f"    -> Stored national data for {year}.")
-            else:
-                print(f"    -> Warning: Could not fetch or parse national data for {year}. Leader/Vote fields will be None.")
-                self.national_year_data[year] = {} 
+        """Fetches national leader and vote data for each target year; the year pages are fetched concurrently."""
+        logger.info(f"Fetching national data for years: {self.target_years}...")
+        year_results = scrape_years(self.target_years, self.session, self.MAX_CONCURRENT_REQUESTS,
+                                    self.throttle, use_cache=self.use_cache)
+        for year, results in year_results.items():
+            self._store_national_year(year, results)
+
+    async def _fetch_national_year_data_async(self, session):
+        """Async variant of _fetch_national_year_data: all year pages go out together over the shared session."""
+        logger.info(f"Fetching national data for years: {self.target_years}...")
+        year_results = await asyncio.gather(
+            *(scrape_election_year_async(year, session, self.throttle) for year in self.target_years),
+            return_exceptions=True
+        )
+        for year, results in zip(self.target_years, year_results):
+            if isinstance(results, Exception):
+                logger.error(f"Error fetching national data for {year}: {results}")
+                results = None
+            self._store_national_year(year, results)
+
+    def _store_national_year(self, year: int, year_results: Optional[List[Dict[str, Any]]]):
+        """Records one year's national leaders/votes and builds its shared YearData."""
+        if year_results:
+            year_entry = {'dem_leader': None, 'rep_leader': None, 'dem_votes': None, 'rep_votes': None}
+            for candidate_data in year_results:
+                party = candidate_data.get("party")
+                leader = candidate_data.get("leader")
+                leader = sys.intern(leader) if leader else None # same names recur across years (incumbents)
+                pop_votes = candidate_data.get("popular_votes")
+                if party is Party.DEMOCRATIC:
+                    year_entry['dem_leader'] = leader
+                    year_entry['dem_votes'] = pop_votes 
+                elif party is Party.REPUBLICAN:
+                    year_entry['rep_leader'] = leader
+                    year_entry['rep_votes'] = pop_votes 
+            self.national_year_data[year] = year_entry
+            logger.debug(f"Stored national data for {year}.")
+        else:
+            logger.warning(f"Could not fetch or parse national data for {year}. Leader/Vote fields will be None.")
+            self.national_year_data[year] = {} 
+        self._year_cache.pop(year, None)
+        self._get_year_data(year)
+
+    def _get_year_data(self, year: int) -> YearData:
+        """Returns the shared YearData for a year, building it from the national data on first use."""
+        year_obj = self._year_cache.get(year)
+        if year_obj is None:
+            national_data = self.national_year_data.get(year, {})
+            year_obj = self._year_cache.setdefault(year, YearData(
+                year=year,
+                dem_leader=national_data.get('dem_leader'),
+                rep_leader=national_data.get('rep_leader'),
+                dem_votes=national_data.get('dem_votes'),
+                rep_votes=national_data.get('rep_votes'),
+                total_votes=None
+            ))
+        return year_obj
 
     def get_state_links_and_names(self) -> Dict[str, str]:
         """ Fetches and parses main states page for state names and URLs. """
-        print(f"\nFetching state list from {self.STATES_LIST_URL}...")
-        soup = fetch_and_parse(self.STATES_LIST_URL, self.session, self.delay_seconds)
-        state_links = parse_state_links(soup) if soup else {}
-        print(f"Found {len(state_links)} state links.")
+        logger.info(f"Fetching state list from {self.STATES_LIST_URL}...")
+        soup = fetch_and_parse(self.STATES_LIST_URL, self.session, throttle=self.throttle)
+        state_links = _dedupe_state_links(parse_state_links(soup) if soup else {})
+        logger.info(f"Found {len(state_links)} state links.")
         return state_links
 
     def scrape_single_state(self, state_name: str, state_url_path: str) -> List[ElectionResult]:
@@ -67,13 +202,26 @@ class StateElectionScraper:
         and returns a list of ElectionResult objects. Uses pre-fetched national data.
         """
         full_url = self.BASE_URL + state_url_path
-        print(f"  Scraping {state_name} from {full_url}...")
-        results_for_state: List[ElectionResult] = []
+        with self._request_slots:
+            logger.debug(f"Scraping {state_name} from {full_url}...")
+            soup = fetch_and_parse(full_url, self.session, parse_only=self._STATE_PAGE_STRAINER, throttle=self.throttle)
+        return self._build_state_results(state_name, soup)
+
+    async def scrape_single_state_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                        state_name: str, state_url_path: str) -> List[ElectionResult]:
+        """ Async counterpart of scrape_single_state; the semaphore bounds in-flight requests. """
+        full_url = self.BASE_URL + state_url_path
+        async with semaphore:
+            logger.debug(f"Scraping {state_name} from {full_url}...")
+            soup = await fetch_and_parse_async(full_url, session, parse_only=self._STATE_PAGE_STRAINER,
+                                               throttle=self.throttle)
+        return self._build_state_results(state_name, soup)
 
-        soup = fetch_and_parse(full_url, self.session, self.delay_seconds)
+    def _build_state_results(self, state_name: str, soup: Optional[BeautifulSoup]) -> List[ElectionResult]:
+        """ Turns a parsed state page into ElectionResult objects using pre-fetched national data. """
         if not soup:
-            print(f"  Could not fetch or parse page for {state_name}. Skipping.")
-            return results_for_state
+            logger.warning(f"Could not fetch or parse page for {state_name}. Skipping.")
+            return []
 
         state_details = parse_state_details(soup)
         electoral_votes = state_details.get('electoral_votes')
@@ -86,59 +234,85 @@ class StateElectionScraper:
                 total_population=total_population
             )
         except (ValueError, TypeError) as e:
-            print(f"  Error creating StateData for {state_name}: {e}. Skipping state.")
-            return results_for_state
+            logger.error(f"Error creating StateData for {state_name}: {e}. Skipping state.")
+            return []
+        # Share one StateData per state name, e.g. when a state page is scraped again on retry
+        state_obj = self._state_cache.setdefault(state_name, state_obj)
 
-        parsed_state_yearly_data = parse_election_results_table(soup, self.target_years)
-        print(f"    Found {len(parsed_state_yearly_data)} yearly state results matching target years.")
+        parsed_state_yearly_data = parse_election_results_table(soup, self._target_years_set)
+        logger.debug(f"Found {len(parsed_state_yearly_data)} yearly state results matching target years.")
+        return self._results_from_rows(state_obj, parsed_state_yearly_data)
 
-        year_obj_cache: Dict[int, YearData] = {}
+    def _results_from_rows(self, state_obj: StateData,
+                           parsed_state_yearly_data: List[ParsedYearRow]) -> List[ElectionResult]:
+        """ Links a state's parsed rows to the shared StateData and this run's YearData. """
+        # Rows are type/range-checked by the parser, so construction here can't raise
+        return [
+            ElectionResult(
+                state_info=state_obj,
+                year_info=self._get_year_data(state_year_data.year),
+                dem_percentage=state_year_data.dem_pct,
+                rep_percentage=state_year_data.rep_pct,
+                winner=state_year_data.winner
+            )
+            for state_year_data in parsed_state_yearly_data
+        ]
 
-        for state_year_data in parsed_state_yearly_data:
-            year = state_year_data.get('year')
-            if year is None:
-                continue
+    def _open_checkpoint(self) -> shelve.Shelf:
+        """
+        Opens the per-state progress shelf used to resume an interrupted crawl.
+        Entries are keyed by state and target years; resume=False starts from scratch.
+        """
+        checkpoint = shelve.open(self.CHECKPOINT_NAME)
+        if not self.resume:
+            checkpoint.clear()
+        return checkpoint
 
-            national_data = self.national_year_data.get(year, {})
+    def _checkpoint_key(self, state_name: str) -> str:
+        return f"{state_name}|{','.join(map(str, self.target_years))}"
 
-            try:
-                if year not in year_obj_cache:
-                    year_obj = YearData(
-                        year=year,
-                        dem_leader=national_data.get('dem_leader'),
-                        rep_leader=national_data.get('rep_leader'),
-                        dem_votes=national_data.get('dem_votes'),
-                        rep_votes=national_data.get('rep_votes'),
-                        total_votes=None
-                    )
-                    year_obj_cache[year] = year_obj
-                else:
-                    year_obj = year_obj_cache[year]
-
-                result_obj = ElectionResult(
-                    state_info=state_obj,
-                    year_info=year_obj,
-                    dem_percentage=state_year_data.get('dem_pct'),
-                    rep_percentage=state_year_data.get('rep_pct'),
-                    winner=state_year_data.get('winner') 
-                )
-                results_for_state.append(result_obj)
-            except (ValueError, TypeError) as e:
-                print(f"    Error creating model objects for {state_name} year {year}: {e}. Skipping year.")
-                continue
+    def _pop_checkpointed(self, checkpoint: shelve.Shelf, state_links: Dict[str, str]) -> List[List[ElectionResult]]:
+        """
+        Removes states finished by a previous, interrupted run from state_links and returns their results.
+        Only the per-state data is saved; the results are relinked to this run's national YearData.
+        """
+        restored = []
+        for state_name in list(state_links):
+            saved = checkpoint.get(self._checkpoint_key(state_name))
+            if isinstance(saved, tuple): # anything else is from an older format and gets scraped again
+                state_obj, rows = saved
+                del state_links[state_name]
+                restored.append(self._results_from_rows(self._state_cache.setdefault(state_name, state_obj), rows))
+        if restored:
+            logger.info(f"Resuming: {len(restored)} states restored from checkpoint.")
+        return restored
 
-        return results_for_state
+    def _save_checkpoint(self, checkpoint: shelve.Shelf, state_name: str, state_results: List[ElectionResult]):
+        # YearData is left out: a run that missed a year's national data must not pin its placeholders
+        saved: Tuple[StateData, List[ParsedYearRow]] = (state_results[0].state_info, [
+            ParsedYearRow(result.year_info.year, result.dem_percentage, result.rep_percentage, result.winner)
+            for result in state_results
+        ])
+        checkpoint[self._checkpoint_key(state_name)] = saved
+        checkpoint.sync()
 
-    def scrape_all_states(self) -> List[ElectionResult]:
-        """ Orchestrates scraping all states, returns list of ElectionResult objects. """
+    def iter_states(self) -> Iterator[List[ElectionResult]]:
+        """ Scrapes all states on a thread pool, yielding each state's results as soon as they are ready. """
         self._fetch_national_year_data()
 
-        all_election_results: List[ElectionResult] = []
         state_links = self.get_state_links_and_names()
         if not state_links:
-            return all_election_results
+            return
+
+        with self._open_checkpoint() as checkpoint:
+            yield from self._pop_checkpointed(checkpoint, state_links)
+            yield from self._iter_states_on_pool(state_links, checkpoint)
+            # Completed crawl: the next run starts fresh
+            checkpoint.clear()
 
-        print(f"\nStarting state page scraping for {len(state_links)} states...")
+    def _iter_states_on_pool(self, state_links: Dict[str, str],
+                             checkpoint: shelve.Shelf) -> Iterator[List[ElectionResult]]:
+        logger.info(f"Starting state page scraping for {len(state_links)} states...")
         with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
             futures = {
                 executor.submit(self.scrape_single_state, state_name, state_url_path): state_name
@@ -149,11 +323,69 @@ class StateElectionScraper:
                 state_name = futures[future]
                 try:
                     state_results = future.result()
-                    if state_results:
-                        all_election_results.extend(state_results)
-                        print(f"  Finished {state_name}. Added {len(state_results)} results.")
                 except Exception as e:
-                    print(f"  Error processing {state_name}: {e}")
+                    logger.error(f"Error processing {state_name}: {e}")
+                    continue
+                if state_results:
+                    logger.info(f"Finished {state_name}. Added {len(state_results)} results.")
+                    self._save_checkpoint(checkpoint, state_name, state_results)
+                    yield state_results
+
+    def scrape_all_states(self) -> List[ElectionResult]:
+        """ Orchestrates scraping all states, returns list of ElectionResult objects. """
+        all_election_results: List[ElectionResult] = []
+        for state_results in self.iter_states():
+            all_election_results.extend(state_results)
+
+        logger.info(f"Scraping finished. Collected {len(all_election_results)} total election results.")
+        return all_election_results
+
+    async def iter_states_async(self) -> AsyncIterator[List[ElectionResult]]:
+        """ Asyncio variant of iter_states: year and state pages are fetched concurrently over one async client. """
+        async with self._open_async_session() as session:
+            await self._fetch_national_year_data_async(session)
+
+            logger.info(f"Fetching state list from {self.STATES_LIST_URL}...")
+            soup = await fetch_and_parse_async(self.STATES_LIST_URL, session, throttle=self.throttle)
+            state_links = _dedupe_state_links(parse_state_links(soup) if soup else {})
+            logger.info(f"Found {len(state_links)} state links.")
+            if not state_links:
+                return
+
+            with self._open_checkpoint() as checkpoint:
+                for state_results in self._pop_checkpointed(checkpoint, state_links):
+                    yield state_results
+                async for state_results in self._iter_states_on_loop(session, state_links, checkpoint):
+                    yield state_results
+                checkpoint.clear()
+
+    async def _iter_states_on_loop(self, session, state_links: Dict[str, str],
+                                   checkpoint: shelve.Shelf) -> AsyncIterator[List[ElectionResult]]:
+        logger.info(f"Starting state page scraping for {len(state_links)} states...")
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        async def scrape(state_name: str):
+            try:
+                return state_name, await self.scrape_single_state_async(
+                    session, semaphore, state_name, state_links[state_name])
+            except Exception as e:
+                return state_name, e
+
+        for next_done in asyncio.as_completed([scrape(state_name) for state_name in state_links]):
+            state_name, outcome = await next_done
+            if isinstance(outcome, Exception):
+                logger.error(f"Error processing {state_name}: {outcome}")
+                continue
+            if outcome:
+                logger.info(f"Finished {state_name}. Added {len(outcome)} results.")
+                self._save_checkpoint(checkpoint, state_name, outcome)
+                yield outcome
+
+    async def scrape_all_states_async(self) -> List[ElectionResult]:
+        """ Asyncio variant of scrape_all_states. """
+        all_election_results: List[ElectionResult] = []
+        async for state_results in self.iter_states_async():
+            all_election_results.extend(state_results)
 
-        print(f"\nScraping finished. Collected {len(all_election_results)} total election results.")
-        return all_election_results
\ No newline at end of file
+        logger.info(f"Scraping finished. Collected {len(all_election_results)} total election results.")
+        return all_election_results
@@ -0,0 +1,37 @@
+# scraper/http_session.py
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401  (lets urllib3/aiohttp/httpx decode br responses)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def configure_session(session: requests.Session, pool_connections: int = 4, pool_maxsize: int = 20) -> requests.Session:
+    """
+    Applies the shared headers and a pooled, retrying HTTPAdapter to a session,
+    so every caller talks to the host over the same kind of keep-alive pool.
+    """
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True, # wait for a pooled connection instead of opening throwaway ones
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=RETRY_STATUSES,
+                          respect_retry_after_header=True)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Process-wide session for callers that don't bring their own (e.g. scrape_election_year used standalone)
+SESSION = configure_session(requests.Session())
@@ -1,41 +1,161 @@
 # scraper/parser.py
+import asyncio
+import aiohttp
+import logging
 import requests
 import time
 import re
-from bs4 import BeautifulSoup
-from typing import Optional, List, Dict, Any, Tuple
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple, AbstractSet
 from models.data_models import Party
-
-def fetch_and_parse(url: str, session: requests.Session, delay_seconds: float = 0.5) -> Optional[BeautifulSoup]:
-    """Optimized fetch function with timeout handling"""
+from scraper.throttle import HostThrottle
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import lxml  # noqa: F401  (C parser, several times faster than html.parser)
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Patterns for the fixed election-page markup, compiled once instead of per row/link
+_YEAR_RE = re.compile(r'(\d{4})')
+_DEM_PCT_RE = re.compile(r'D:?\s*([\d.]+)%')
+_REP_PCT_RE = re.compile(r'R:?\s*([\d.]+)%')
+_EV_HEADING_RE = re.compile(r'(\d+)\s+ELECTORAL VOTES')
+_EV_SUFFIX_RE = re.compile(r'\s*\(\s*\d+\s*EV\s*\)\s*$')
+_LEADING_NUMBER_RE = re.compile(r'^\s*\d+\s*')
+_PLAIN_PCT_RE = re.compile(r'\s*(\d+(?:\.\d*)?|\.\d+)\s*%?\s*')
+_PCT_DROP_RE = re.compile(r'[^\d.]+')
+_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+# Separators/whitespace dropped from integer cells
+_INT_DELETE = str.maketrans('', '', ', \t\n\r\f\v\xa0')
+_STATES_AZ_HEADING_RE = re.compile(r'States\s+A-Z', re.IGNORECASE)
+
+# CSS selectors for the states list, compiled once by soupsieve instead of on every select() call
+_LIST_STATE_LINK_SEL = soupsieve.compile('li > a[href^="/states/"]')
+_ANY_STATE_LINK_SEL = soupsieve.compile('a[href^="/states/"]')
+
+# Winner lookup indexed by 1 + (dem > rep) - (rep > dem): REP lead, tie, DEM lead
+_WINNER_TABLE = (Party.REPUBLICAN, Party.OTHER, Party.DEMOCRATIC)
+
+def make_soup(content: bytes, parse_only: Optional[SoupStrainer] = None,
+              encoding: Optional[str] = None) -> BeautifulSoup:
+    """
+    Builds a soup from raw page bytes with the fastest available parser, optionally restricted by a strainer.
+    A known encoding (e.g. the HTTP charset) is tried first, skipping bs4's encoding detection.
+    """
+    return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only, from_encoding=encoding)
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Returns the charset declared in a Content-Type header, or None (no ISO-8859-1 guess for text/*)."""
+    if not content_type:
+        return None
+    match = _CHARSET_RE.search(content_type)
+    return match.group(1) if match else None
+
+def _is_cached(url: str, session: requests.Session) -> bool:
+    """True when a requests-cache session holds a fresh response for the URL; expired ones still hit the network."""
+    cache = getattr(session, 'cache', None)
+    if cache is None:
+        return False
+    response = cache.get_response(cache.create_key(requests.Request('GET', url)))
+    return response is not None and not response.is_expired
+
+async def _is_cached_async(url: str, session) -> bool:
+    """Async counterpart of _is_cached for aiohttp-client-cache sessions."""
+    cache = getattr(session, 'cache', None)
+    if cache is None:
+        return False
+    # Read the stored entry directly: cache.get_response() would delete an expired one
+    response = await cache.responses.read(str(cache.create_key('GET', url)))
+    return response is not None and not response.is_expired
+
+def fetch_and_parse(url: str, session: requests.Session, delay_seconds: float = 0.5,
+                    parse_only: Optional[SoupStrainer] = None,
+                    throttle: Optional[HostThrottle] = None) -> Optional[BeautifulSoup]:
+    """Optimized fetch function with timeout handling; a shared throttle replaces the fixed delay."""
     try:
-        time.sleep(delay_seconds)
+        # The politeness delay only applies to real network hits, not cached responses
+        if not _is_cached(url, session):
+            if throttle is not None:
+                throttle.wait(url)
+            else:
+                time.sleep(delay_seconds)
         response = session.get(url, timeout=15)
+        if throttle is not None:
+            throttle.record_response(url, response.status_code, response.headers.get('Retry-After'))
         response.raise_for_status()
-        try:
-            return BeautifulSoup(response.content, 'lxml')
-        except ImportError:
-            return BeautifulSoup(response.content, 'html.parser')
+        return make_soup(response.content, parse_only,
+                         charset_from_content_type(response.headers.get('Content-Type')))
+    except requests.exceptions.RetryError as e: # urllib3 gave up retrying 429/5xx responses
+        if throttle is not None:
+            throttle.backoff(url)
+        logger.error(f"Error fetching URL {url}: {str(e)[:100]}...")
+        return None
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching URL {url}: {str(e)[:100]}...")
+        logger.error(f"Error fetching URL {url}: {str(e)[:100]}...")
+        return None
+    except Exception as e:
+        logger.error(f"Error parsing URL {url}: {str(e)[:100]}...")
+        return None
+
+async def _read_async(url: str, session, throttle: Optional[HostThrottle] = None) -> Tuple[bytes, Optional[str]]:
+    """Fetches raw page bytes and the declared charset with either an httpx.AsyncClient or an aiohttp session."""
+    if httpx is not None and isinstance(session, httpx.AsyncClient):
+        response = await session.get(url, timeout=15)
+        if throttle is not None:
+            throttle.record_response(url, response.status_code, response.headers.get('Retry-After'))
+        response.raise_for_status()
+        return response.content, charset_from_content_type(response.headers.get('Content-Type'))
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
+        if throttle is not None:
+            throttle.record_response(url, response.status, response.headers.get('Retry-After'))
+        response.raise_for_status()
+        return await response.read(), charset_from_content_type(response.headers.get('Content-Type'))
+
+_ASYNC_FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError) + ((httpx.HTTPError,) if httpx else ())
+
+async def fetch_and_parse_async(url: str, session, delay_seconds: float = 0.5,
+                                parse_only: Optional[SoupStrainer] = None,
+                                throttle: Optional[HostThrottle] = None) -> Optional[BeautifulSoup]:
+    """Async fetch (aiohttp or httpx session); the HTML parse runs in the default executor to keep the event loop free."""
+    try:
+        if not await _is_cached_async(url, session):
+            if throttle is not None:
+                await throttle.wait_async(url)
+            else:
+                await asyncio.sleep(delay_seconds)
+        content, encoding = await _read_async(url, session, throttle)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, make_soup, content, parse_only, encoding)
+    except _ASYNC_FETCH_ERRORS as e:
+        logger.error(f"Error fetching URL {url}: {str(e)[:100]}...")
         return None
     except Exception as e:
-        print(f"Error parsing URL {url}: {str(e)[:100]}...")
+        logger.error(f"Error parsing URL {url}: {str(e)[:100]}...")
         return None
 
 def parse_state_links(soup: BeautifulSoup) -> Dict[str, str]:
     """Parses the main states list page soup to find state names and URLs."""
     state_links = {}
     if not soup:
-        print("Warning: No soup object provided to parse_state_links.")
+        logger.warning("No soup object provided to parse_state_links.")
         return state_links
 
     content_area = soup.find('main', id='main') or soup.find('div', id='primary') or soup.body
     if not content_area:
-        print("Warning: Could not find main content area (main#main or div#primary) on states page.")
+        logger.warning("Could not find main content area (main#main or div#primary) on states page.")
         return state_links
 
-    heading = content_area.find(['h2', 'h3'], string=re.compile(r'States\s+A-Z', re.IGNORECASE))
+    heading = content_area.find(['h2', 'h3'], string=_STATES_AZ_HEADING_RE)
     target_list = None
     if heading:
         target_list = heading.find_next_sibling('ul')
@@ -43,29 +163,29 @@ def parse_state_links(soup: BeautifulSoup) -> Dict[str, str]:
     if not target_list:
          all_lists = content_area.find_all('ul')
          for ul in all_lists:
-             potential_links = ul.select('li > a[href^="/states/"]')
+             potential_links = _LIST_STATE_LINK_SEL.select(ul)
              if potential_links and len(potential_links[0]['href'].split('/')) == 3:
                  target_list = ul
-                 print("Debug: Found state link list using fallback search (no .html check).")
+                 logger.debug("Found state link list using fallback search (no .html check).")
                  break
 
     if not target_list:
-        print("Warning: Could not find the specific <ul> containing state links.")
-        links = content_area.select('a[href^="/states/"]')
-        print(f"Debug: Last resort search found {len(links)} potential links in content_area.")
+        logger.warning("Could not find the specific <ul> containing state links.")
+        links = _ANY_STATE_LINK_SEL.select(content_area)
+        logger.debug(f"Last resort search found {len(links)} potential links in content_area.")
         if not links:
             return state_links
     else:
-        links = target_list.select('li > a[href^="/states/"]')
-        print(f"Debug: Found {len(links)} potential links in the targeted list (no .html check).")
+        links = _LIST_STATE_LINK_SEL.select(target_list)
+        logger.debug(f"Found {len(links)} potential links in the targeted list (no .html check).")
 
     for link in links:
         href = link.get('href')
         if href and href.startswith('/states/') and len(href.split('/')) == 3:
             if href == '/states/' or href == '/states': continue
             state_name = link.get_text(strip=True)
-            state_name = re.sub(r'\s*\(\s*\d+\s*EV\s*\)\s*$', '', state_name).strip()
-            state_name = re.sub(r'^\s*\d+\s*', '', state_name).strip()
+            state_name = _EV_SUFFIX_RE.sub('', state_name).strip()
+            state_name = _LEADING_NUMBER_RE.sub('', state_name).strip()
             if state_name and state_name not in state_links:
                  if len(state_name) < 30 and not state_name.isdigit():
                     state_links[state_name] = href
@@ -74,45 +194,67 @@ def parse_state_links(soup: BeautifulSoup) -> Dict[str, str]:
          dc_link = content_area.find('a', href='/states/district_of_columbia')
          if dc_link:
              dc_name = dc_link.get_text(strip=True)
-             dc_name = re.sub(r'\s*\(\s*\d+\s*EV\s*\)\s*$', '', dc_name).strip()
+             dc_name = _EV_SUFFIX_RE.sub('', dc_name).strip()
              state_links[dc_name] = "/states/district_of_columbia"
-             print("Debug: Added District of Columbia link explicitly (no .html).")
+             logger.debug("Added District of Columbia link explicitly (no .html).")
 
     if not state_links:
-         print("Warning: After all attempts, failed to extract any valid state links.")
+         logger.warning("After all attempts, failed to extract any valid state links.")
     else:
-         print(f"Debug: Final state link count: {len(state_links)}")
+         logger.debug(f"Final state link count: {len(state_links)}")
 
     return state_links
 
+def parse_int(text: str) -> Optional[int]:
+    """Parses integer text like ' 17 ' or '81,268,924'; one translate pass instead of strip/replace copies."""
+    cleaned = text.translate(_INT_DELETE)
+    return int(cleaned) if cleaned.isdecimal() else None
+
 def parse_state_details(soup: BeautifulSoup) -> Dict[str, Optional[int]]:
     """Parses state detail page for Electoral Votes."""
     details = {'electoral_votes': None, 'total_population': None}
     if not soup: return details
 
     try:
-        ev_span_large = soup.find('span', class_='ev')
-        if ev_span_large and ev_span_large.get_text(strip=True).isdigit():
-             details['electoral_votes'] = int(ev_span_large.get_text(strip=True))
+        # One pass over the candidate tags instead of three find() traversals; priority stays
+        # span.ev > "N ELECTORAL VOTES" heading > big font-size span
+        ev_large, ev_heading, ev_span_alt = None, None, None
+        seen_ev_span = False
+        for tag in soup.find_all(['span', 'h2', 'h3']):
+            if tag.name == 'span':
+                if not seen_ev_span and 'ev' in tag.get('class', ()):
+                    seen_ev_span = True # only the first span.ev counts, as with find()
+                    ev_large = parse_int(tag.get_text())
+                    if ev_large is not None:
+                        break
+                if ev_span_alt is None:
+                    style = tag.get('style')
+                    if style and 'font-size:4em' in style.lower():
+                        ev_span_alt = tag
+            elif ev_heading is None and tag.string and 'ELECTORAL VOTES' in tag.string.upper():
+                ev_heading = tag
+
+        if ev_large is not None:
+             details['electoral_votes'] = ev_large
         else:
-             ev_heading = soup.find(['h2','h3'], string=lambda t: t and 'ELECTORAL VOTES' in t.upper())
              if ev_heading:
                  heading_text = ev_heading.get_text(strip=True)
-                 match = re.match(r'(\d+)\s+ELECTORAL VOTES', heading_text)
+                 match = _EV_HEADING_RE.match(heading_text)
                  if match:
                      details['electoral_votes'] = int(match.group(1))
-                 else:
+                 elif ev_heading.parent is not soup:
+                     # Only trust a sibling span inside the heading's own container; a heading left at
+                     # the root by a SoupStrainer has every other kept tag on the page as a sibling
                      ev_span = ev_heading.find_next_sibling('span')
-                     if ev_span and ev_span.get_text(strip=True).isdigit():
-                         details['electoral_votes'] = int(ev_span.get_text(strip=True))
+                     if ev_span:
+                         details['electoral_votes'] = parse_int(ev_span.get_text())
 
         if details['electoral_votes'] is None:
-            ev_span_alt = soup.find('span', style=lambda s: s and 'font-size:4em' in s.lower())
-            if ev_span_alt and ev_span_alt.get_text(strip=True).isdigit():
-                 details['electoral_votes'] = int(ev_span_alt.get_text(strip=True))
+            if ev_span_alt:
+                 details['electoral_votes'] = parse_int(ev_span_alt.get_text())
 
     except Exception as e:
-        print(f"Warning: Error extracting electoral votes: {e}")
+        logger.warning(f"Error extracting electoral votes: {e}")
 
     details['total_population'] = None
 
@@ -122,23 +264,47 @@ def parse_percentage(text: str) -> Optional[float]:
     """Helper function to parse percentage strings robustly (0-100)."""
     if not text: return None
     try:
-        cleaned_text = text.strip().replace('%', '').replace('\xa0', '')
-        cleaned_text = ''.join(filter(lambda x: x.isdigit() or x == '.', cleaned_text))
-        if cleaned_text.count('.') > 1:
-             parts = cleaned_text.split('.')
-             cleaned_text = parts[0] + '.' + ''.join(parts[1:])
-        if not cleaned_text or cleaned_text == '.': return None
-        value = float(cleaned_text)
+        plain_match = _PLAIN_PCT_RE.fullmatch(text)
+        if plain_match: # Common case "45.2%": one regex match instead of the char-by-char clean-up
+            value = float(plain_match.group(1))
+        else:
+            cleaned_text = _PCT_DROP_RE.sub('', text) # keeps only digits and dots, in one C-level pass
+            if cleaned_text.count('.') > 1:
+                 head, *tail = cleaned_text.split('.')
+                 cleaned_text = head + '.' + ''.join(tail)
+            if not cleaned_text or cleaned_text == '.': return None
+            value = float(cleaned_text)
         if 0 <= value <= 100.1:
             return round(min(value, 100.0), 2)
         else:
-            print(f"Warning: Parsed percentage '{value}' out of range (0-100). Text was: '{text}'")
+            logger.warning(f"Parsed percentage '{value}' out of range (0-100). Text was: '{text}'")
             return None
     except ValueError:
         return None
 
-def parse_election_results_table(soup: BeautifulSoup, target_years: List[int]) -> List[Dict[str, Any]]:
-    """Parses the historical results table on a state page for Year, Percentages, and Winner."""
+@dataclass(slots=True, frozen=True)
+class ParsedYearRow:
+    """One visible results-table row for a target year, as returned by parse_election_results_table."""
+    year: int
+    dem_pct: Optional[float]
+    rep_pct: Optional[float]
+    winner: Optional[Party]
+
+def _is_valid_row(row: ParsedYearRow) -> bool:
+    """Plain checks on a parsed row so the model constructors downstream can't raise."""
+    if not isinstance(row.year, int):
+        return False
+    for pct in (row.dem_pct, row.rep_pct):
+        if pct is not None and not (isinstance(pct, (int, float)) and 0 <= pct <= 100):
+            return False
+    return row.winner is None or isinstance(row.winner, Party)
+
+def _is_visible_style(style: Optional[str]) -> bool:
+    """Style-attribute filter for find_all: rejects rows hidden with display:none."""
+    return not style or not ('display' in style and 'none' in style)
+
+def parse_election_results_table(soup: BeautifulSoup, target_years: AbstractSet[int]) -> List[ParsedYearRow]:
+    """Parses the historical results table on a state page for Year, Percentages, and Winner (target_years is a set)."""
     parsed_results = []
     if not soup: return parsed_results
 
@@ -146,23 +312,24 @@ def parse_election_results_table(soup: BeautifulSoup, target_years: List[int]) -
     if not results_table:
         results_table = soup.find('table', class_='state-results-table')
         if not results_table:
-             print("Warning: Results table ('recent_elections' or fallback) not found.")
+             logger.warning("Results table ('recent_elections' or fallback) not found.")
              return parsed_results
 
-    rows = results_table.find_all('tr', class_='toggle-row')
+    # Hidden (display:none) rows are filtered inside the tree search instead of re-checked per row
+    rows = results_table.find_all('tr', class_='toggle-row', style=_is_visible_style)
     if not rows:
          tbody = results_table.find('tbody')
          if tbody:
-             rows = [r for r in tbody.find_all('tr', recursive=False) if len(r.find_all('td', recursive=False)) >= 2]
+             rows = [r for r in tbody.find_all('tr', recursive=False, style=_is_visible_style)
+                     if len(r.find_all('td', recursive=False)) >= 2]
 
     if not rows:
-        print("Warning: No suitable result rows found in table.")
+        logger.warning("No suitable result rows found in table.")
         return parsed_results
 
+    row_warnings: List[str] = [] # emitted as one record after the loop
+    remaining_years = set(target_years) # the table runs back decades; stop once every target year is found
     for row in rows:
-        style = row.get('style', '')
-        if 'display' in style and 'none' in style: continue
-
         cells = row.find_all('td', recursive=False)
         if len(cells) < 2: continue
 
@@ -170,21 +337,21 @@ def parse_election_results_table(soup: BeautifulSoup, target_years: List[int]) -
         winner = None
 
         try:
-            year_cell_text = cells[0].get_text(strip=True)
-            year_match = re.search(r'(\d{4})', year_cell_text)
+            year_cell_text = cells[0].get_text() # regex search below, so no need for the strip walk
+            year_match = _YEAR_RE.search(year_cell_text)
             if year_match:
                 year = int(year_match.group(1))
             else:
                 year_tag = cells[0].find(['span', 'strong', 'a'])
                 if year_tag:
-                     year_match = re.search(r'(\d{4})', year_tag.get_text(strip=True))
+                     year_match = _YEAR_RE.search(year_tag.get_text(strip=True))
                      if year_match: year = int(year_match.group(1))
 
         except Exception as e:
-            print(f"Warning: Could not parse year from cell: {cells[0].prettify()[:100]}... Error: {e}")
+            row_warnings.append(f"Could not parse year from cell: {cells[0].prettify()[:100]}... Error: {e}")
             continue
 
-        if year is None or year not in target_years: continue
+        if year is None or year not in remaining_years: continue
 
         try:
             results_cell = cells[1]
@@ -192,36 +359,35 @@ def parse_election_results_table(soup: BeautifulSoup, target_years: List[int]) -
             if nested_table:
                  nested_row = nested_table.find('tr')
                  if nested_row:
-                     nested_cells = nested_row.find_all('td')
+                     nested_cells = nested_row.find_all('td', limit=3) # only the DEM (0) and REP (2) cells are read
                      if len(nested_cells) >= 1:
                          dem_pct = parse_percentage(nested_cells[0].get_text(strip=True))
                      if len(nested_cells) >= 3:
                          rep_pct = parse_percentage(nested_cells[2].get_text(strip=True))
             else:
                  cell_text = results_cell.get_text(separator='|', strip=True)
-                 dem_match = re.search(r'D:?\s*([\d.]+)%', cell_text)
-                 rep_match = re.search(r'R:?\s*([\d.]+)%', cell_text)
+                 dem_match = _DEM_PCT_RE.search(cell_text)
+                 rep_match = _REP_PCT_RE.search(cell_text)
                  if dem_match: dem_pct = parse_percentage(dem_match.group(1))
                  if rep_match: rep_pct = parse_percentage(rep_match.group(1))
 
         except Exception as e:
-             print(f"Warning (Year {year}): Error parsing percentages/winner structure: {e}")
+             row_warnings.append(f"(Year {year}) Error parsing percentages/winner structure: {e}")
 
         if dem_pct is not None and rep_pct is not None:
-            if dem_pct > rep_pct:
-                winner = Party.DEMOCRATIC
-            elif rep_pct > dem_pct:
-                winner = Party.REPUBLICAN
-            else:
-                winner = Party.OTHER
+            winner = _WINNER_TABLE[1 + (dem_pct > rep_pct) - (rep_pct > dem_pct)]
         elif dem_pct is not None or rep_pct is not None:
              winner = Party.OTHER
 
-        parsed_results.append({
-            'year': year,
-            'dem_pct': dem_pct,
-            'rep_pct': rep_pct,
-            'winner': winner
-        })
+        row_data = ParsedYearRow(year, dem_pct, rep_pct, winner)
+        if not _is_valid_row(row_data):
+            row_warnings.append(f"Skipping invalid row: {row_data}")
+            continue
+        parsed_results.append(row_data)
+        remaining_years.discard(year)
+        if not remaining_years:
+            break
 
+    if row_warnings:
+        logger.warning("\n".join(row_warnings))
     return parsed_results
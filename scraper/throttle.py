@@ -0,0 +1,88 @@
+# scraper/throttle.py
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Responses that mean the server wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds; HTTP-date values are ignored."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+class HostThrottle:
+    """
+    Per-host politeness delay shared by all workers.
+    Each request to a host reserves the next free slot, so requests to the
+    same host start at least delay_seconds apart (staggered across threads or
+    tasks instead of every worker sleeping the full delay), while requests to
+    different hosts don't wait on each other.
+    The delay adapts per host: it doubles on 429/503 (honouring Retry-After)
+    and halves back towards delay_seconds on successful responses. Slots get a
+    small random jitter so workers don't fall into lock-step.
+    """
+    MAX_DELAY_SECONDS = 30.0
+    JITTER_FRACTION = 0.1
+
+    def __init__(self, delay_seconds: float = 0.5):
+        self.delay_seconds = delay_seconds
+        self._host_next_time: Dict[str, float] = {}
+        self._host_delay: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, url: str) -> float:
+        """Claims the next slot for the URL's host and returns how long to wait for it."""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            delay = self._host_delay.get(host, self.delay_seconds)
+            slot = max(now, self._host_next_time.get(host, 0.0))
+            self._host_next_time[host] = slot + delay + random.uniform(0, delay * self.JITTER_FRACTION)
+        return slot - now
+
+    def backoff(self, url: str, retry_after: Optional[float] = None):
+        """Doubles the host's delay and, if the server sent Retry-After, holds its next slot until then."""
+        host = urlparse(url).netloc
+        with self._lock:
+            delay = self._host_delay.get(host, self.delay_seconds)
+            self._host_delay[host] = min(max(delay * 2, 0.1), self.MAX_DELAY_SECONDS)
+            if retry_after:
+                resume_at = time.monotonic() + retry_after
+                self._host_next_time[host] = max(self._host_next_time.get(host, 0.0), resume_at)
+
+    def record_response(self, url: str, status: int, retry_after_header: Optional[str] = None):
+        """Adapts the host's delay to a response status: back off when throttled, recover on success."""
+        if status in THROTTLE_STATUSES:
+            self.backoff(url, _retry_after_seconds(retry_after_header))
+            return
+        if status >= 400:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            delay = self._host_delay.get(host)
+            if delay is not None:
+                delay /= 2
+                if delay <= self.delay_seconds:
+                    del self._host_delay[host]
+                else:
+                    self._host_delay[host] = delay
+
+    def wait(self, url: str):
+        """Blocks the calling thread until the host's slot comes up."""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def wait_async(self, url: str):
+        """Async counterpart of wait()."""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -1,81 +1,228 @@
+import os
 import requests
-from bs4 import BeautifulSoup
 import logging
+from bs4 import SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+from models.data_models import Party
+from scraper.parser import make_soup, fetch_and_parse_async, parse_int, charset_from_content_type, _is_cached
+from scraper.http_session import SESSION
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-TARGET_PARTIES = ["Democratic", "Republican"] 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 
-def scrape_election_year(year):
+# Party cell text -> enum; the lookup doubles as the target-party filter
+TARGET_PARTIES = {"Democratic": Party.DEMOCRATIC, "Republican": Party.REPUBLICAN}
+TARGET_PARTY_COUNT = len(TARGET_PARTIES)
+
+YEAR_URL_TEMPLATE = "https://www.270towin.com/{year}-election"
+# Only the results table is read from a year page; skip building the rest of the document
+YEAR_PAGE_STRAINER = SoupStrainer('table')
+
+# Year pages plus their ETag/Last-Modified validators, for conditional GETs on plain sessions
+YEAR_CACHE_DIR = '.year_cache'
+
+def _year_cache_paths(year):
+    """Returns the (html, etag, lastmod) cache file paths for a year."""
+    base = os.path.join(YEAR_CACHE_DIR, str(year))
+    return base + '.html', base + '.etag', base + '.lastmod'
+
+def _read_validator(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _conditional_headers(year):
+    """Builds If-None-Match/If-Modified-Since headers from the cached validators, if the page is cached."""
+    html_path, etag_path, lastmod_path = _year_cache_paths(year)
+    if not os.path.exists(html_path):
+        return {}
+    headers = {}
+    etag = _read_validator(etag_path)
+    if etag:
+        headers['If-None-Match'] = etag
+    last_modified = _read_validator(lastmod_path)
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+def _store_year_page(year, response):
+    """Caches a 200 response body with its validators; pages without validators can't be revalidated, so they're skipped."""
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not (etag or last_modified):
+        return
+    html_path, etag_path, lastmod_path = _year_cache_paths(year)
+    try:
+        os.makedirs(YEAR_CACHE_DIR, exist_ok=True)
+        with open(html_path, 'wb') as f:
+            f.write(response.content)
+        for path, value in ((etag_path, etag), (lastmod_path, last_modified)):
+            if value:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(value)
+            elif os.path.exists(path):
+                os.remove(path)
+    except OSError as e:
+        logging.warning(f"Could not cache page for year {year}: {e}")
+
+def _read_cached_year_page(year):
+    with open(_year_cache_paths(year)[0], 'rb') as f:
+        return f.read()
+
+def _is_target_party(text):
+    return text is not None and text.strip() in TARGET_PARTIES
+
+def _collect_candidates(row_cells, year):
+    """
+    Builds the candidate dicts from the results rows, each given as the list of its stripped cell texts.
+    Stops as soon as every target party has been found.
+    """
+    election_data = []
+    found_parties_count = 0
+
+    for cells in row_cells:
+        if len(cells) >= 6: 
+            try:
+                party = cells[3]
+                party_enum = TARGET_PARTIES.get(party)
+
+                if party_enum is not None:
+                    name = cells[2]
+                    electoral_votes = parse_int(cells[4])
+                    popular_votes = parse_int(cells[5])
+
+                    name = name.partition('(')[0].strip()
+
+                    election_data.append({
+                        "party": party_enum,
+                        "leader": name,
+                        "electoral_votes": electoral_votes,
+                        "popular_votes": popular_votes
+                    })
+                    found_parties_count += 1
+                    logging.info(f"Found data for {party} candidate: {name}")
+
+                    if found_parties_count == TARGET_PARTY_COUNT:
+                        break
+
+            except IndexError:
+                continue
+            except Exception as cell_e:
+                logging.error(f"Error processing row cells for year {year}: {cell_e} | Row cells: {cells}")
+
+    if not election_data:
+         logging.warning(f"Extracted data list is empty for year {year}. Check table structure.")
+    elif found_parties_count < TARGET_PARTY_COUNT:
+         logging.warning(f"Only found data for {found_parties_count}/{TARGET_PARTY_COUNT} target parties for year {year}.")
+
+    return election_data
+
+def parse_election_year(soup, year):
+    """
+    Extracts the Democratic/Republican candidate rows from a parsed year page.
+    """
+    results_tbody = None
+    table_div = soup.find('div', class_='table-responsive')
+    if table_div:
+        results_tbody = table_div.find('tbody')
+    else:
+         # Strained soups (YEAR_PAGE_STRAINER) hold only the tables; take the tbody around the first party cell text
+         party_text = soup.find(string=_is_target_party)
+         if party_text:
+             results_tbody = party_text.find_parent('tbody')
+             if results_tbody:
+                 logging.debug("Found results table by party search.")
+
+    if not results_tbody:
+        logging.warning(f"Could not find the results table body for year {year}.")
+        return [] 
+
+    # Walk the rows lazily; the loop usually stops after the two major-party rows
+    row_cells = (
+        [cell.get_text(strip=True) for cell in row.find_all('td', limit=6)] # only the first six cells are read
+        for row in results_tbody.children if row.name == 'tr'
+    )
+    return _collect_candidates(row_cells, year)
+
+def parse_election_year_html(html, year):
+    """
+    Lexbor (selectolax) counterpart of parse_election_year, working on the page HTML directly.
+    Requires selectolax; scrape_election_year only calls it when the import succeeded.
+    """
+    tree = LexborHTMLParser(html)
+    results_tbody = tree.css_first('div.table-responsive tbody')
+    if results_tbody is None:
+        for cell in tree.css('td'):
+            if cell.text(strip=True) in TARGET_PARTIES:
+                results_tbody = cell.parent
+                while results_tbody is not None and results_tbody.tag != 'tbody':
+                    results_tbody = results_tbody.parent
+                if results_tbody is not None:
+                    logging.debug("Found results table by party search.")
+                break
+
+    if results_tbody is None:
+        logging.warning(f"Could not find the results table body for year {year}.")
+        return []
+
+    row_cells = ([cell.text(strip=True) for cell in row.css('td')[:6]] for row in results_tbody.css('tr'))
+    return _collect_candidates(row_cells, year)
+
+def _decode_page(content, charset):
+    try:
+        return content.decode(charset or 'utf-8', errors='replace')
+    except LookupError: # unknown charset label
+        return content.decode('utf-8', errors='replace')
+
+def scrape_election_year(year, session=None, throttle=None, use_cache=True):
     """
     Fetches and parses election results for a specific year from 270towin.com.
+    Pass a session to share its connection pool (and cache); defaults to the shared http_session.SESSION.
+    A shared HostThrottle spaces out the requests to the host, as in fetch_and_parse.
+    With use_cache=False the .year_cache validator files are neither read nor written.
     """
-    url = f"https://www.270towin.com/{year}-election"
+    url = YEAR_URL_TEMPLATE.format(year=year)
     logging.info(f"Attempting to scrape data for year {year} from {url}")
     election_data = []
-    found_parties_count = 0
 
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10) 
+        session = session or SESSION
+        # requests_cache sessions already revalidate on their own; only plain sessions use the validator files
+        conditional = use_cache and getattr(session, 'cache', None) is None
+        request_headers = _conditional_headers(year) if conditional else {}
+        # The politeness delay only applies to real network hits, not cached responses
+        if throttle is not None and not _is_cached(url, session):
+            throttle.wait(url)
+        response = session.get(url, headers=request_headers, timeout=10)
+        if throttle is not None:
+            throttle.record_response(url, response.status_code, response.headers.get('Retry-After'))
         response.raise_for_status() 
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        results_tbody = None
-        table_div = soup.find('div', class_='table-responsive')
-        if table_div:
-            results_tbody = table_div.find('tbody')
+        if response.status_code == 304:
+            logging.info(f"Year {year} page not modified; using cached copy.")
+            content, charset = _read_cached_year_page(year), None
         else:
-             all_tables = soup.find_all('table')
-             for table in all_tables:
-                 if table.find(string=lambda text: "Democratic" in text or "Republican" in text):
-                     results_tbody = table.find('tbody')
-                     if results_tbody:
-                         logging.info("Found results table via fallback search.")
-                         break
-
-        if not results_tbody:
-            logging.warning(f"Could not find the results table body for year {year}.")
-            return [] 
-        rows = results_tbody.find_all('tr')
-
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 6: 
-                try:
-                    party = cells[3].get_text(strip=True)
-
-                    if party in TARGET_PARTIES:
-                        name = cells[2].get_text(strip=True)
-                        electoral_votes = cells[4].get_text(strip=True)
-                        popular_votes = cells[5].get_text(strip=True)
-
-                        name = name.split('(')[0].strip()
-
-                        election_data.append({
-                            "party": party,
-                            "leader": name,
-                            "electoral_votes": electoral_votes,
-                            "popular_votes": popular_votes
-                        })
-                        found_parties_count += 1
-                        logging.info(f"Found data for {party} candidate: {name}")
-
-                        if found_parties_count == len(TARGET_PARTIES):
-                            break
-
-                except IndexError:
-                    continue
-                except Exception as cell_e:
-                    logging.error(f"Error processing row cells for year {year}: {cell_e} | Row HTML: {row}")
-
-        if not election_data:
-             logging.warning(f"Extracted data list is empty for year {year}. Check table structure.")
-        elif found_parties_count < len(TARGET_PARTIES):
-             logging.warning(f"Only found data for {found_parties_count}/{len(TARGET_PARTIES)} target parties for year {year}.")
+            if conditional:
+                _store_year_page(year, response)
+            content = response.content
+            charset = charset_from_content_type(response.headers.get('Content-Type'))
 
+        if LexborHTMLParser is not None:
+            election_data = parse_election_year_html(_decode_page(content, charset), year)
+        else:
+            soup = make_soup(content, parse_only=YEAR_PAGE_STRAINER, encoding=charset)
+            election_data = parse_election_year(soup, year)
 
+    except requests.exceptions.RetryError as e: # urllib3 gave up retrying 429/5xx responses
+        if throttle is not None:
+            throttle.backoff(url)
+        logging.error(f"Error fetching URL {url}: {e}")
     except requests.exceptions.HTTPError as e:
         logging.error(f"HTTP Error fetching URL {url}: {e}")
     except requests.exceptions.ConnectionError as e:
@@ -89,3 +236,31 @@ def scrape_election_year(year):
 
     return election_data
 
+def scrape_years(years, session=None, max_workers=8, throttle=None, use_cache=True):
+    """
+    Scrapes several years concurrently over one shared session; returns {year: election_data}.
+    The work is network-bound, so threads overlap the waits on the host. Pass a HostThrottle
+    to keep the per-host politeness delay; the workers then take staggered slots.
+    """
+    session = session or SESSION
+    years = list(years)
+    if not years:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(len(years), max_workers))) as executor:
+        year_results = executor.map(lambda year: scrape_election_year(year, session, throttle, use_cache), years)
+        return dict(zip(years, year_results))
+
+async def scrape_election_year_async(year, session, throttle=None):
+    """
+    Async variant of scrape_election_year over a shared aiohttp/httpx session.
+    """
+    url = YEAR_URL_TEMPLATE.format(year=year)
+    logging.info(f"Attempting to scrape data for year {year} from {url}")
+    soup = await fetch_and_parse_async(url, session, parse_only=YEAR_PAGE_STRAINER, throttle=throttle)
+    if soup is None:
+        return []
+    try:
+        return parse_election_year(soup, year)
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while scraping year {year}: {e}")
+        return []
@@ -0,0 +1,49 @@
+import unittest
+
+from scraper.collector import StateElectionScraper
+from scraper.parser import make_soup, parse_state_details
+
+# EV heading without a number; its span sits further down the same container, and an
+# unrelated span in the next container would be the heading's sibling on a flattened tree
+SEPARATED_EV_PAGE = b"""<html><body>
+<div class="ev-box"><h3>ELECTORAL VOTES</h3><p>Allocated by statewide vote</p><span>17</span></div>
+<div class="sidebar"><span>99</span></div>
+</body></html>"""
+
+# Everything inside one wrapper div, as on the real state pages
+WRAPPED_PAGE = (b'<html><body><div id="wrapper"><div><h3>17 ELECTORAL VOTES</h3><span class="ev">17</span></div>'
+                + b'<ul>' + b'<li><a href="#">link</a></li>' * 200 + b'</ul>'
+                + b'<table class="state-results-table"><tr><td>2020</td></tr></table></div></body></html>')
+
+
+def count_tags(soup):
+    return len(soup.find_all(True))
+
+
+class ParseStateDetailsTest(unittest.TestCase):
+    def parse(self, content, parse_only=None):
+        return parse_state_details(make_soup(content, parse_only))
+
+    def test_ev_span_not_next_to_heading(self):
+        self.assertEqual(self.parse(SEPARATED_EV_PAGE)['electoral_votes'], 17)
+
+    def test_flattened_heading_skips_unrelated_span(self):
+        details = self.parse(SEPARATED_EV_PAGE, StateElectionScraper._STATE_PAGE_STRAINER)
+        self.assertIsNone(details['electoral_votes'])
+
+    def test_ev_class_span(self):
+        page = b'<html><body><div><h3>17 ELECTORAL VOTES</h3><span class="ev">17</span></div></body></html>'
+        self.assertEqual(self.parse(page, StateElectionScraper._STATE_PAGE_STRAINER)['electoral_votes'], 17)
+
+
+class StatePageStrainerTest(unittest.TestCase):
+    def test_strainer_drops_wrapped_content(self):
+        full = make_soup(WRAPPED_PAGE)
+        strained = make_soup(WRAPPED_PAGE, StateElectionScraper._STATE_PAGE_STRAINER)
+        self.assertLess(count_tags(strained), count_tags(full) // 10)
+        self.assertEqual(parse_state_details(strained)['electoral_votes'], 17)
+        self.assertIsNotNone(strained.find('table', class_='state-results-table'))
+
+
+if __name__ == '__main__':
+    unittest.main()
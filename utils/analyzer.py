@@ -1,9 +1,13 @@
 import pandas as pd
 import os
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from typing import List, Dict, Union, Optional
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -18,6 +22,13 @@ TEMPLATE_DIR = "utils"
 BAR_CHART_TEMPLATE_NAME = "report_template.html"
 STATIC_MAPS_TEMPLATE_NAME = "map_report_template.html"
 
+# Shared across reports: the Environment caches compiled templates, and auto_reload=False skips the mtime checks
+_JINJA_ENV = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(['html', 'xml']),
+                         auto_reload=False)
+
+# The templates load this exact plotly.js build once from the CDN, matching the figures' JSON schema
+PLOTLY_JS_VERSION = get_plotlyjs_version()
+
 PARTY_COLORS = {
     'Democratic': 'blue',
     'Republican': 'red'
@@ -33,34 +44,124 @@ YEAR_COL = 'year'
 STATE_NAME_COL = 'state_name'
 WINNER_COL = 'state_winner'
 
+STATE_CODE_COL = 'state_code'
+
+# Two-letter codes for the choropleth; plotly's 'USA-states' location mode is keyed on them
+STATE_ABBR = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'District of Columbia': 'DC', 'Florida': 'FL',
+    'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN',
+    'Iowa': 'IA', 'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME',
+    'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
+    'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH',
+    'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND',
+    'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI',
+    'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT',
+    'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI',
+    'Wyoming': 'WY'
+}
+
+REQUIRED_COLS = [
+    YEAR_COL, DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL,
+    STATE_NAME_COL, DEM_STATE_PCT_COL, REP_STATE_PCT_COL, WINNER_COL,
+    DEM_LEADER_COL, REP_LEADER_COL
+]
+NUMERIC_COLS = [DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL, DEM_STATE_PCT_COL, REP_STATE_PCT_COL]
+STR_COLS = [STATE_NAME_COL, WINNER_COL, DEM_LEADER_COL, REP_LEADER_COL]
+LEADER_COLS = [DEM_LEADER_COL, REP_LEADER_COL]
+# Everything is read as text, skipping the parser's type inference; numeric columns are coerced
+# after the read, so a malformed cell becomes NaN instead of failing the whole load
+CSV_DTYPES = dict.fromkeys(REQUIRED_COLS, 'string')
+
+try:
+    import pyarrow  # noqa: F401  (multithreaded C++ CSV reader, also needed for the Parquet cache)
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    pyarrow = None
+    CSV_ENGINE = 'c'
+
+try:
+    import orjson  # noqa: F401  (fast figure serialization; plotly's pure-json engine is the fallback)
+    PLOTLY_JSON_ENGINE = 'orjson'
+except ImportError:
+    PLOTLY_JSON_ENGINE = 'json'
+
+# Reports are well under this size, so the rendered chunks reach the disk in a single write() call
+REPORT_WRITE_BUFFER_SIZE = 1 << 20
+
+# Bump when load_data's cleanup changes, so older cached frames are rebuilt
+PARQUET_CACHE_VERSION = 2
+
+def _parquet_cache_paths(filepath: str):
+    """Returns the (parquet, sidecar) paths caching the cleaned frame for a CSV."""
+    base = os.path.splitext(filepath)[0]
+    return f"{base}.parquet", f"{base}.parquet.meta"
+
+def _csv_signature(filepath: str) -> str:
+    """Validator for the cached frame: cache version plus the source CSV's mtime and size."""
+    stat = os.stat(filepath)
+    return f"{PARQUET_CACHE_VERSION},{stat.st_mtime_ns},{stat.st_size}"
+
+def _read_cached_frame(filepath: str) -> Optional[pd.DataFrame]:
+    """Returns the cached cleaned frame when its sidecar still matches the CSV, else None."""
+    if pyarrow is None:
+        return None
+    cache_path, meta_path = _parquet_cache_paths(filepath)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            if f.read().strip() != _csv_signature(filepath):
+                return None
+        return pd.read_parquet(cache_path)
+    except Exception as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Ignoring unreadable cache for {filepath}: {e}")
+        return None
+
+def _write_cached_frame(filepath: str, df: pd.DataFrame):
+    if pyarrow is None:
+        return
+    cache_path, meta_path = _parquet_cache_paths(filepath)
+    try:
+        df.to_parquet(cache_path, compression='zstd')
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            f.write(_csv_signature(filepath))
+    except Exception as e:
+        logger.warning(f"Could not write cleaned-data cache {cache_path}: {e}")
+
 def load_data(filepath: str) -> Optional[pd.DataFrame]:
     logger.info(f"Attempting to load data from: {filepath}")
     if not os.path.exists(filepath):
         logger.error(f"Error: Input CSV file not found at {filepath}")
         return None
-    try:
-        df = pd.read_csv(filepath)
-        logger.info(f"Successfully loaded data with shape: {df.shape}")
-        logger.debug(f"CSV Columns loaded: {df.columns.tolist()}")
+    df = _read_cached_frame(filepath)
+    if df is not None:
+        logger.info(f"Loaded cleaned data from cache with shape: {df.shape}")
+        return df
+    df = _read_and_clean_csv(filepath)
+    if df is not None:
+        _write_cached_frame(filepath, df)
+    return df
 
-        required_cols = [
-            YEAR_COL, DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL,
-            STATE_NAME_COL, DEM_STATE_PCT_COL, REP_STATE_PCT_COL, WINNER_COL,
-            DEM_LEADER_COL, REP_LEADER_COL
-        ]
-        missing_cols = [col for col in required_cols if col not in df.columns]
+def _read_and_clean_csv(filepath: str) -> Optional[pd.DataFrame]:
+    """Reads the combined CSV and applies the type conversion and row cleanup."""
+    try:
+        header = pd.read_csv(filepath, nrows=0).columns # header only, so unused columns are never parsed
+        missing_cols = [col for col in REQUIRED_COLS if col not in header]
         if missing_cols:
             logger.error(f"Missing required columns in CSV: {missing_cols}")
             return None
 
-        numeric_cols = [DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL, DEM_STATE_PCT_COL, REP_STATE_PCT_COL]
-        logger.info("Converting relevant columns to numeric...")
-        for col in numeric_cols:
-            if col in df.columns:
-                original_dtype = df[col].dtype
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                if df[col].isnull().any():
-                     logger.warning(f"Column '{col}' contained non-numeric values -> NaN. Original type: {original_dtype}")
+        df = pd.read_csv(filepath, engine=CSV_ENGINE, usecols=REQUIRED_COLS, dtype=CSV_DTYPES)
+        logger.info(f"Successfully loaded data with shape: {df.shape}")
+        logger.debug(f"CSV Columns loaded: {df.columns.tolist()}")
+
+        # Vote counts are float since missing or non-numeric votes are NaN
+        df[NUMERIC_COLS] = df[NUMERIC_COLS].apply(pd.to_numeric, errors='coerce').astype('float64')
+        nan_cols = [col for col, has_nan in df[NUMERIC_COLS].isna().any().items() if has_nan]
+        if nan_cols:
+            logger.warning(f"Columns {nan_cols} contain missing or non-numeric values -> NaN.")
+        # Strip every text column in one batched pass
+        df[STR_COLS] = df[STR_COLS].apply(lambda col: col.str.strip())
 
         vote_cols = [DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL]
         rows_before_drop = len(df)
@@ -70,27 +171,24 @@ def load_data(filepath: str) -> Optional[pd.DataFrame]:
         if rows_before_drop > rows_after_drop:
              logger.warning(f"Dropped {rows_before_drop - rows_after_drop} rows due to missing national vote data.")
 
-        df[WINNER_COL] = df[WINNER_COL].astype(str).str.strip()
-        logger.info(f"Unique raw values in '{WINNER_COL}' before cleaning None/NA: {df[WINNER_COL].unique()}")
-        df[WINNER_COL] = df[WINNER_COL].replace({'nan': None, '': None, 'N/A': None})
-        df.dropna(subset=[WINNER_COL], inplace=True)
-        logger.info(f"Unique values in '{WINNER_COL}' after cleaning None/NA and dropping: {df[WINNER_COL].dropna().unique()}") # Use dropna() for unique
+        logger.info(f"Unique raw values in '{WINNER_COL}' before cleaning: {df[WINNER_COL].unique()}")
         valid_winners = list(PARTY_COLORS.keys())
+        # Two-value categorical: anything outside the parties (blank, 'N/A', typos) becomes NaN in the same pass
+        df[WINNER_COL] = pd.Categorical(df[WINNER_COL], categories=valid_winners)
         initial_rows = len(df)
-        df = df[df[WINNER_COL].isin(valid_winners)].copy() # Use .copy() for explicit copy
+        df = df[df[WINNER_COL].notna()]
         if len(df) < initial_rows:
              removed_count = initial_rows - len(df)
-             logger.warning(f"Removed {removed_count} rows with unexpected winner values not in {valid_winners}.")
+             logger.warning(f"Removed {removed_count} rows with missing or unexpected winner values not in {valid_winners}.")
 
-        df[DEM_LEADER_COL] = df[DEM_LEADER_COL].fillna('N/A').astype(str).str.strip()
-        df[REP_LEADER_COL] = df[REP_LEADER_COL].fillna('N/A').astype(str).str.strip()
+        # Leaders repeat for every state of a year, so they're stored as categories too
+        df[LEADER_COLS] = df[LEADER_COLS].fillna('N/A').astype('category')
 
         df[YEAR_COL] = pd.to_numeric(df[YEAR_COL], errors='coerce').astype('Int64')
         if df[YEAR_COL].isnull().any():
              logger.warning("Found missing or non-numeric values in 'year' column. Rows with invalid years will be excluded.")
              df.dropna(subset=[YEAR_COL], inplace=True)
 
-        df[STATE_NAME_COL] = df[STATE_NAME_COL].astype(str).str.strip()
         df.dropna(subset=[STATE_NAME_COL], inplace=True) # Drop if state name is missing
 
 
@@ -104,6 +202,32 @@ def load_data(filepath: str) -> Optional[pd.DataFrame]:
         logger.error(f"An error occurred during data loading or cleaning: {e}", exc_info=True)
         return None
 
+def _figure_json(fig: go.Figure) -> str:
+    """
+    Serializes a figure for the report templates, which draw it with Plotly.newPlot from one shared plotly.js include.
+    validate=False skips the schema check (the figures are built here); '</' is escaped so the JSON can't close its <script>.
+    """
+    return pio.to_json(fig, validate=False, engine=PLOTLY_JSON_ENGINE).replace('</', '<\\/')
+
+def _party_bar_figure(years: pd.Series, dem_pct: pd.Series, rep_pct: pd.Series, title: str, y_label: str) -> go.Figure:
+    """
+    Grouped Democratic/Republican bar chart built straight from the wide percentage columns,
+    with the same look as the former melt + px.bar version. Missing percentages get no bar.
+    """
+    traces = []
+    for party, pct in (('Democratic', dem_pct), ('Republican', rep_pct)):
+        valid = pct.notna()
+        traces.append(go.Bar(
+            name=party, x=years[valid], y=pct[valid], marker_color=PARTY_COLORS[party],
+            legendgroup=party, offsetgroup=party, alignmentgroup='True',
+            texttemplate='%{y:.1f}', textposition='outside',
+            hovertemplate=f"Party={party}<br>Election Year=%{{x}}<br>{y_label}=%{{y}}<extra></extra>"
+        ))
+    fig = go.Figure(traces)
+    fig.update_layout(barmode='group', title=title, xaxis_title='Election Year', yaxis_title=y_label,
+                      legend_title_text='Party', yaxis_range=[0, 100])
+    return fig
+
 def create_national_plot(df: pd.DataFrame) -> Optional[str]:
     logger.info("Generating national trends plot (bar chart)...")
     if df.empty or not {DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL}.issubset(df.columns):
@@ -111,11 +235,10 @@ def create_national_plot(df: pd.DataFrame) -> Optional[str]:
         return "<p>No data available for national plot.</p>"
     try:
         vote_cols = [DEM_NAT_VOTE_COL, REP_NAT_VOTE_COL]
-        national_votes = df.groupby(YEAR_COL)[vote_cols].first().reset_index()
-
-        national_votes[DEM_NAT_VOTE_COL] = pd.to_numeric(national_votes[DEM_NAT_VOTE_COL], errors='coerce')
-        national_votes[REP_NAT_VOTE_COL] = pd.to_numeric(national_votes[REP_NAT_VOTE_COL], errors='coerce')
-        national_votes.dropna(subset=vote_cols, inplace=True) # Drop if conversion failed
+        # National votes repeat on every state row of a year; keep one row per year (already float from load_data)
+        national_votes = (df[[YEAR_COL] + vote_cols].dropna(subset=vote_cols)
+                          .drop_duplicates(subset=[YEAR_COL])
+                          .sort_values(YEAR_COL, ignore_index=True))
 
         national_votes['total_votes'] = national_votes[DEM_NAT_VOTE_COL] + national_votes[REP_NAT_VOTE_COL]
         national_votes = national_votes[national_votes['total_votes'] > 0].copy() # Filter zero votes
@@ -124,25 +247,12 @@ def create_national_plot(df: pd.DataFrame) -> Optional[str]:
             logger.warning("No valid national vote data found after filtering zero total votes.")
             return "<p>No valid national vote data to plot after filtering.</p>"
 
-        national_votes['Democratic (%)'] = (national_votes[DEM_NAT_VOTE_COL] / national_votes['total_votes']) * 100
-        national_votes['Republican (%)'] = (national_votes[REP_NAT_VOTE_COL] / national_votes['total_votes']) * 100
+        dem_pct = national_votes[DEM_NAT_VOTE_COL] / national_votes['total_votes'] * 100
+        rep_pct = national_votes[REP_NAT_VOTE_COL] / national_votes['total_votes'] * 100
 
-        plot_data = national_votes.melt(
-            id_vars=[YEAR_COL], value_vars=['Democratic (%)', 'Republican (%)'],
-            var_name='Party', value_name='Percentage'
-        )
-        plot_data['Party'] = plot_data['Party'].str.replace(r' \(\%\)', '', regex=True)
-
-        fig = px.bar(
-            plot_data, x=YEAR_COL, y='Percentage', color='Party', barmode='group',
-            title="National Popular Vote Share (%) by Year",
-            labels={'Percentage': 'Vote Percentage (%)', YEAR_COL: 'Election Year'},
-            text_auto='.1f',
-            color_discrete_map={'Democratic': PARTY_COLORS['Democratic'], 'Republican': PARTY_COLORS['Republican']} # Explicit map
-        )
-        fig.update_layout(yaxis_range=[0, 100])
-        fig.update_traces(textposition='outside')
-        plot_div = fig.to_html(full_html=False, include_plotlyjs='cdn')
+        fig = _party_bar_figure(national_votes[YEAR_COL], dem_pct, rep_pct,
+                                "National Popular Vote Share (%) by Year", 'Vote Percentage (%)')
+        plot_div = _figure_json(fig)
         logger.info("National trends bar chart created successfully.")
         return plot_div
     except Exception as e:
@@ -162,44 +272,16 @@ def create_state_plot(state_df: pd.DataFrame, state_name: str) -> Optional[str]:
         return f"<p>Missing data columns for {state_name} bar chart.</p>"
 
     try:
-        state_plot_data = state_df[[YEAR_COL] + pct_cols].copy()
-
-        state_plot_data[DEM_STATE_PCT_COL] = pd.to_numeric(state_plot_data[DEM_STATE_PCT_COL], errors='coerce')
-        state_plot_data[REP_STATE_PCT_COL] = pd.to_numeric(state_plot_data[REP_STATE_PCT_COL], errors='coerce')
-
-        state_plot_data.rename(columns={
-            DEM_STATE_PCT_COL: 'Democratic', REP_STATE_PCT_COL: 'Republican'
-        }, inplace=True)
-
-        state_plot_data.dropna(subset=['Democratic', 'Republican'], how='all', inplace=True)
+        state_plot_data = state_df[[YEAR_COL] + pct_cols].dropna(subset=pct_cols, how='all')
 
         if state_plot_data.empty:
             logger.warning(f"No valid percentage data rows to plot for state bar chart: {state_name} after dropping NaNs.")
             return f"<p>No graphable percentage data available for {state_name} bar chart.</p>"
 
-        state_plot_data = state_plot_data.melt(
-            id_vars=[YEAR_COL], value_vars=['Democratic', 'Republican'],
-            var_name='Party', value_name='Percentage'
-        )
-
-        state_plot_data['Percentage'] = pd.to_numeric(state_plot_data['Percentage'], errors='coerce')
-        # Optional: Drop rows if percentage became NaN during melt/conversion (shouldn't happen often)
-        state_plot_data.dropna(subset=['Percentage'], inplace=True)
-
-        if state_plot_data.empty:
-             logger.warning(f"No numeric percentage values found for {state_name} after melt.")
-             return f"<p>Could not plot percentages for {state_name}.</p>"
-
-        fig = px.bar(
-            state_plot_data, x=YEAR_COL, y='Percentage', color='Party', barmode='group',
-            title=f"{state_name} Presidential Vote Share (%) by Year",
-            labels={'Percentage': 'State Vote Percentage (%)', YEAR_COL: 'Election Year'},
-            text_auto='.1f',
-            color_discrete_map={'Democratic': PARTY_COLORS['Democratic'], 'Republican': PARTY_COLORS['Republican']} # Explicit map
-        )
-        fig.update_layout(yaxis_range=[0, 100])
-        fig.update_traces(textposition='outside')
-        plot_div = fig.to_html(full_html=False, include_plotlyjs=False)
+        fig = _party_bar_figure(state_plot_data[YEAR_COL], state_plot_data[DEM_STATE_PCT_COL],
+                                state_plot_data[REP_STATE_PCT_COL],
+                                f"{state_name} Presidential Vote Share (%) by Year", 'State Vote Percentage (%)')
+        plot_div = _figure_json(fig)
         logger.debug(f"Bar chart created successfully for state: {state_name}")
         return plot_div
     except Exception as e:
@@ -211,35 +293,34 @@ def generate_bar_chart_html_report(national_plot_div: Optional[str], state_plot_
     if not national_plot_div and not state_plot_divs:
          logger.warning("Both national and state bar chart data are missing. Bar chart HTML report will be mostly empty.")
     try:
-        env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(['html', 'xml']))
-        template = env.get_template(BAR_CHART_TEMPLATE_NAME) # Assumes bar chart template still exists
+        template = _JINJA_ENV.get_template(BAR_CHART_TEMPLATE_NAME) # Assumes bar chart template still exists
         logger.info(f"Loaded Jinja template: {BAR_CHART_TEMPLATE_NAME}")
         years_str = f"{min(years)} - {max(years)}" if years else "N/A"
-        national_plot_html = national_plot_div if national_plot_div and "<p>" not in national_plot_div else \
-                             "<p>National bar chart could not be generated. Check logs and input data.</p>"
+        national_plot_json = national_plot_div if national_plot_div and "<p>" not in national_plot_div else None
 
         valid_state_plots = {k: v for k, v in state_plot_divs.items() if v and "<p>" not in v}
         if len(valid_state_plots) < len(state_plot_divs):
             logger.warning(f"Excluded {len(state_plot_divs) - len(valid_state_plots)} state bar charts due to generation errors.")
 
         context = {
-            'national_plot_div': national_plot_html,
+            'national_plot_json': national_plot_json,
             'state_plot_divs': valid_state_plots, # Pass only valid plots
-            'years_analyzed': years_str
+            'years_analyzed': years_str,
+            'plotly_js_version': PLOTLY_JS_VERSION
         }
         logger.debug("Context prepared for bar chart Jinja template.")
-        html_content = template.render(context)
-        logger.info("Bar chart HTML template rendered successfully.")
         os.makedirs(os.path.dirname(output_path), exist_ok=True) # Ensure dir exists
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Stream the rendered chunks straight to disk instead of building the whole page as one string
+        with open(output_path, 'wb', buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+            template.stream(context).dump(f, encoding='utf-8')
+        logger.info("Bar chart HTML template rendered successfully.")
         logger.info(f"Bar chart HTML report successfully generated and saved at: {output_path}")
     except Exception as e:
         logger.error(f"Failed to generate bar chart HTML report: {e}", exc_info=True)
 
 
 
-def create_static_map(df_year: pd.DataFrame, year: int, include_js: bool = False) -> Optional[str]:
+def create_static_map(df_year: pd.DataFrame, year: int) -> Optional[str]:
     """Creates a static Plotly choropleth map for a single election year."""
     logger.info(f"Generating static map for year: {year}...")
 
@@ -258,17 +339,24 @@ def create_static_map(df_year: pd.DataFrame, year: int, include_js: bool = False
         logger.warning(f"No valid states found for map in year {year} after filtering winners.")
         return f"<p>No states with valid winners ({valid_winners}) found for {year}.</p>"
 
+    df_year[STATE_CODE_COL] = df_year[STATE_NAME_COL].map(STATE_ABBR)
+    unknown_states = df_year[STATE_CODE_COL].isna()
+    if unknown_states.any():
+        logger.warning(f"No state code for {df_year.loc[unknown_states, STATE_NAME_COL].tolist()} in year {year}; left off the map.")
+        df_year = df_year[~unknown_states]
+
     logger.debug(f"Data shape for year {year} map: {df_year.shape}")
     logger.debug(f"Unique winners for year {year} map: {df_year[WINNER_COL].unique()}")
 
     try:
         fig = px.choropleth(
             df_year,
-            locations=STATE_NAME_COL,
+            locations=STATE_CODE_COL,
             locationmode='USA-states',
             color=WINNER_COL,               # Column with 'Democratic', 'Republican'
             hover_name=STATE_NAME_COL,      # Show state name bold in hover
             hover_data={                    # Define extra hover data
+                STATE_CODE_COL: False,      # Location key only; the state name is the hover title
                 WINNER_COL: True,           # Show winner party (already used for color)
                 DEM_LEADER_COL: True,       # Show Dem candidate
                 REP_LEADER_COL: True,       # Show Rep candidate
@@ -285,7 +373,7 @@ def create_static_map(df_year: pd.DataFrame, year: int, include_js: bool = False
             legend_title_text='State Winner'
         )
 
-        plot_div = fig.to_html(full_html=False, include_plotlyjs=include_js)
+        plot_div = _figure_json(fig)
 
         logger.info(f"Static map created successfully for year: {year}")
         return plot_div
@@ -303,8 +391,7 @@ def generate_static_maps_report(map_divs: Dict[int, str], years: List[int], outp
          logger.warning("No map divs provided. Static maps HTML report will be empty.")
 
     try:
-        env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(['html', 'xml']))
-        template = env.get_template(STATIC_MAPS_TEMPLATE_NAME)
+        template = _JINJA_ENV.get_template(STATIC_MAPS_TEMPLATE_NAME)
         logger.info(f"Loaded Jinja template: {STATIC_MAPS_TEMPLATE_NAME}")
 
         years_str = f"{min(years)} - {max(years)}" if years else "N/A"
@@ -313,19 +400,31 @@ def generate_static_maps_report(map_divs: Dict[int, str], years: List[int], outp
         context = {
             'map_divs': map_divs,
             'years_sorted': years_sorted,
-            'years_analyzed_str': years_str
+            'years_analyzed_str': years_str,
+            'plotly_js_version': PLOTLY_JS_VERSION
         }
         logger.debug("Context prepared for static maps Jinja template.")
-        html_content = template.render(context)
-        logger.info("Static maps HTML template rendered successfully.")
         os.makedirs(os.path.dirname(output_path), exist_ok=True) # Ensure dir exists
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Stream the rendered chunks straight to disk instead of building the whole page as one string
+        with open(output_path, 'wb', buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+            template.stream(context).dump(f, encoding='utf-8')
+        logger.info("Static maps HTML template rendered successfully.")
         logger.info(f"Static maps HTML report successfully generated and saved at: {output_path}")
     except Exception as e:
         logger.error(f"Failed to generate static maps HTML report: {e}", exc_info=True)
 
 
+def _plot_one_state(item):
+    """Process-pool task: (state, state_df) -> (state, bar chart figure JSON)."""
+    state, state_df = item
+    return state, create_state_plot(state_df, state)
+
+def _map_one_year(item):
+    """Process-pool task: (year, df_year) -> (year, map figure JSON)."""
+    year, df_year = item
+    return year, create_static_map(df_year, year)
+
+
 if __name__ == "__main__":
     logger.info("="*30)
     logger.info("Starting Election Analysis Script (Bar Charts & Static Maps)")
@@ -365,31 +464,28 @@ if __name__ == "__main__":
             logger.info("-" * 20 + " Generating Bar Chart Report " + "-" * 20)
             national_bar_div = create_national_plot(df_loaded.copy())
             state_bar_divs = {}
-            if STATE_NAME_COL in df_loaded.columns:
-                states = sorted(df_loaded[STATE_NAME_COL].unique())
-                logger.info(f"Processing {len(states)} states for bar charts...")
-                processed_bar_states = 0
-                for state in states:
-                    state_df = df_loaded[df_loaded[STATE_NAME_COL] == state].copy()
-                    # Pass include_js=False as national plot includes it
-                    state_div = create_state_plot(state_df, state)
-                    if state_div:
-                        state_bar_divs[state] = state_div
-                        processed_bar_states += 1
-                logger.info(f"Successfully generated bar chart data for {processed_bar_states}/{len(states)} states.")
-            else:
-                logger.error(f"Column '{STATE_NAME_COL}' not found. Skipping state bar charts.")
-            generate_bar_chart_html_report(national_bar_div, state_bar_divs, analyzed_years, output_bar_chart_html_path)
-
-            logger.info("-" * 20 + " Generating Static Maps Report " + "-" * 20)
-            static_map_divs = {}
-            include_js_for_map = True
-            for year in analyzed_years:
-                df_year = df_loaded[df_loaded[YEAR_COL] == year].copy()
-                map_div = create_static_map(df_year, year, include_js=include_js_for_map)
-                if map_div: # Only store successfully generated maps
-                    static_map_divs[year] = map_div
-                    include_js_for_map = False # Don't include JS for subsequent maps
+            # Every state chart / year map is independent CPU work (pandas + Plotly rendering), so spread them over cores
+            with ProcessPoolExecutor() as executor:
+                if STATE_NAME_COL in df_loaded.columns:
+                    # One groupby pass splits every state's rows (sorted by name) instead of a full-column scan per state
+                    state_groups = df_loaded.groupby(STATE_NAME_COL, sort=True)
+                    states = state_groups.ngroups
+                    logger.info(f"Processing {states} states for bar charts...")
+                    processed_bar_states = 0
+                    for state, state_div in executor.map(_plot_one_state, state_groups):
+                        if state_div:
+                            state_bar_divs[state] = state_div
+                            processed_bar_states += 1
+                    logger.info(f"Successfully generated bar chart data for {processed_bar_states}/{states} states.")
+                else:
+                    logger.error(f"Column '{STATE_NAME_COL}' not found. Skipping state bar charts.")
+                generate_bar_chart_html_report(national_bar_div, state_bar_divs, analyzed_years, output_bar_chart_html_path)
+
+                logger.info("-" * 20 + " Generating Static Maps Report " + "-" * 20)
+                static_map_divs = {}
+                for year, map_div in executor.map(_map_one_year, df_loaded.groupby(YEAR_COL, sort=True)):
+                    if map_div: # Only store successfully generated maps
+                        static_map_divs[year] = map_div
 
             generate_static_maps_report(static_map_divs, analyzed_years, output_static_maps_html_path)
 
@@ -1,8 +1,36 @@
 import csv
 import json
+import operator
 import os
-from typing import List, Dict, Any
-from models.data_models import ElectionResult
+from typing import List, Dict, Any, Tuple
+from models.data_models import ElectionResult, PARTY_VALUES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CSV_HEADER = [
+    'state_name', 'electoral_votes', 'total_population', 
+    'year', 'dem_leader', 'rep_leader', 'dem_national_votes', 'rep_national_votes', 'total_national_votes',
+    'dem_state_percentage', 'rep_state_percentage', 'state_winner' 
+]
+
+# Output files get a 1 MiB buffer instead of the 8 KiB default, so a full run is a handful of write() calls
+WRITE_BUFFER_SIZE = 1 << 20
+
+def _dumps_json(data: Any, pretty: bool = False) -> bytes:
+    """Serializes to UTF-8 JSON, compact or indented by 2 spaces; uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(data)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _sync_file(f):
+    """Flushes Python's buffer and fsyncs once, so durability costs one sync per file rather than per write."""
+    f.flush()
+    os.fsync(f.fileno())
 
 def _create_output_dir(dir_path: str = "output"):
     """Creates the output directory if it doesn't exist."""
@@ -12,10 +40,25 @@ def _create_output_dir(dir_path: str = "output"):
         print(f"Error creating directory {dir_path}: {e}")
         raise 
 
-def save_to_csv(results: List[ElectionResult], filename: str = "election_results.csv", output_dir: str = "output"):
+# Every CSV column except state_winner, fetched in one C-level call per row; csv.writer
+# already writes None as an empty field
+_ROW_FIELDS = operator.attrgetter(
+    'state_info.state_name', 'state_info.electoral_votes', 'state_info.total_population',
+    'year_info.year', 'year_info.dem_leader', 'year_info.rep_leader',
+    'year_info.dem_votes', 'year_info.rep_votes', 'year_info.total_votes',
+    'dem_percentage', 'rep_percentage'
+)
+
+def _result_to_row(result: ElectionResult) -> Tuple[Any, ...]:
+    """Flattens an ElectionResult into one CSV row matching CSV_HEADER."""
+    return (*_ROW_FIELDS(result), PARTY_VALUES[result.winner] if result.winner else '')
+
+def save_to_csv(results: List[ElectionResult], filename: str = "election_results.csv", output_dir: str = "output",
+                fsync: bool = False):
     """
     Saves the list of ElectionResult objects to a CSV file.
     Data includes state info, national year info (leaders/votes), and state percentages/winner.
+    fsync=True syncs the file to disk once after the last row.
     """
     if not results:
         print("No results to save to CSV.")
@@ -25,36 +68,14 @@ def save_to_csv(results: List[ElectionResult], filename: str = "election_results
     filepath = os.path.join(output_dir, filename)
     print(f"Saving data to CSV: {filepath}...")
 
-    header = [
-        'state_name', 'electoral_votes', 'total_population', 
-        'year', 'dem_leader', 'rep_leader', 'dem_national_votes', 'rep_national_votes', 'total_national_votes',
-        'dem_state_percentage', 'rep_state_percentage', 'state_winner' 
-    ]
-
     try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as csvfile:
             writer = csv.writer(csvfile)
-            writer.writerow(header) 
-
-            for result in results:
-                state_info = result.state_info
-                year_info = result.year_info
-
-                row = [
-                    state_info.state_name,
-                    state_info.electoral_votes if state_info.electoral_votes is not None else '',
-                    state_info.total_population if state_info.total_population is not None else '', 
-                    year_info.year,
-                    year_info.dem_leader if year_info.dem_leader else '',
-                    year_info.rep_leader if year_info.rep_leader else '',
-                    year_info.dem_votes if year_info.dem_votes is not None else '',
-                    year_info.rep_votes if year_info.rep_votes is not None else '', 
-                    year_info.total_votes if year_info.total_votes is not None else '', 
-                    result.dem_percentage if result.dem_percentage is not None else '', 
-                    result.rep_percentage if result.rep_percentage is not None else '',
-                    result.winner.value if result.winner else ''
-                ]
-                writer.writerow(row)
+            writer.writerow(CSV_HEADER) 
+
+            writer.writerows(map(_result_to_row, results))
+            if fsync:
+                _sync_file(csvfile)
         print(f"Successfully saved {len(results)} results to {filepath}")
     except IOError as e:
         print(f"Error writing to CSV file {filepath}: {e}")
@@ -81,13 +102,29 @@ def _convert_result_to_dict(result: ElectionResult) -> Dict[str, Any]:
         "state_election_details": {
             "dem_state_percentage": result.dem_percentage,
             "rep_state_percentage": result.rep_percentage,
-            "state_winner": result.winner.value if result.winner else None 
+            "state_winner": PARTY_VALUES[result.winner] if result.winner else None 
         }
     }
 
-def save_to_json(results: List[ElectionResult], filename: str = "election_results.json", output_dir: str = "output"):
+def _json_record(result: ElectionResult, pretty: bool = False) -> bytes:
+    """
+    One result as an element of the top-level JSON array: a single compact line, or (pretty)
+    indented one level like a whole-list dump.
+    """
+    record = _dumps_json(_convert_result_to_dict(result), pretty)
+    return record.replace(b'\n', b'\n  ') if pretty else record
+
+def _json_separator(first: bool, pretty: bool) -> bytes:
+    if pretty:
+        return b'\n  ' if first else b',\n  '
+    return b'\n' if first else b',\n'
+
+def save_to_json(results: List[ElectionResult], filename: str = "election_results.json", output_dir: str = "output",
+                 pretty: bool = False, fsync: bool = False):
     """
     Saves the list of ElectionResult objects to a JSON file with nested structure.
+    Records are written compact, one per line; pass pretty=True for a 2-space indented file.
+    fsync=True syncs the file to disk once after the last record.
     """
     if not results:
         print("No results to save to JSON.")
@@ -97,15 +134,82 @@ def save_to_json(results: List[ElectionResult], filename: str = "election_result
     filepath = os.path.join(output_dir, filename)
     print(f"Saving data to JSON: {filepath}...")
 
-    data_to_save = [_convert_result_to_dict(result) for result in results]
-
     try:
-        with open(filepath, 'w', encoding='utf-8') as jsonfile:
-            json.dump(data_to_save, jsonfile, indent=4, ensure_ascii=False)
+        # Records are serialized and written one at a time, so the full list of dicts never exists in memory
+        with open(filepath, 'wb', buffering=WRITE_BUFFER_SIZE) as jsonfile:
+            jsonfile.write(b'[')
+            for i, result in enumerate(results):
+                jsonfile.write(_json_separator(i == 0, pretty))
+                jsonfile.write(_json_record(result, pretty))
+            jsonfile.write(b'\n]')
+            if fsync:
+                _sync_file(jsonfile)
         print(f"Successfully saved {len(results)} results to {filepath}")
     except IOError as e:
         print(f"Error writing to JSON file {filepath}: {e}")
     except TypeError as e:
          print(f"Error serializing data to JSON: {e}") 
     except Exception as e:
-        print(f"An unexpected error occurred during JSON saving: {e}", exc_info=True)
\ No newline at end of file
+        print(f"An unexpected error occurred during JSON saving: {e}", exc_info=True)
+
+class ResultFileWriter:
+    """
+    Streams batches of ElectionResult objects to the CSV and JSON output files
+    as they arrive, so results never have to be collected in full before saving.
+    Files are opened on the first non-empty batch; nothing is written otherwise.
+    The JSON layout follows save_to_json (compact by default, pretty=True to indent).
+    fsync=True syncs both files to disk once, on close.
+    """
+    def __init__(self, csv_filename: str = "election_results.csv",
+                 json_filename: str = "election_results.json", output_dir: str = "output",
+                 pretty: bool = False, fsync: bool = False):
+        self.csv_path = os.path.join(output_dir, csv_filename)
+        self.json_path = os.path.join(output_dir, json_filename)
+        self.output_dir = output_dir
+        self.pretty = pretty
+        self.fsync = fsync
+        self.count = 0
+        self._csv_file = None
+        self._json_file = None
+        self._csv_writer = None
+
+    def __enter__(self) -> "ResultFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open(self):
+        _create_output_dir(self.output_dir)
+        print(f"Streaming data to CSV: {self.csv_path} and JSON: {self.json_path}...")
+        self._csv_file = open(self.csv_path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_writer.writerow(CSV_HEADER)
+        self._json_file = open(self.json_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self._json_file.write(b'[')
+
+    def write(self, results: List[ElectionResult]):
+        """Appends one batch (typically one state's results) to both files."""
+        if not results:
+            return
+        if self._csv_file is None:
+            self._open()
+
+        self._csv_writer.writerows(map(_result_to_row, results))
+        for result in results:
+            self._json_file.write(_json_separator(self.count == 0, self.pretty))
+            self._json_file.write(_json_record(result, self.pretty))
+            self.count += 1
+
+    def close(self):
+        """Terminates the JSON array and closes both files."""
+        if self._csv_file is None:
+            return
+        self._json_file.write(b'\n]')
+        if self.fsync:
+            _sync_file(self._csv_file)
+            _sync_file(self._json_file)
+        self._csv_file.close()
+        self._json_file.close()
+        self._csv_file = self._json_file = self._csv_writer = None
+        print(f"Successfully saved {self.count} results to {self.csv_path} and {self.json_path}")